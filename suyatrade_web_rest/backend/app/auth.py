@@ -1,11 +1,17 @@
 from __future__ import annotations
-import time, asyncio
+import time, asyncio, hashlib
 import httpx
 from typing import Dict, Any
+from . import metrics, shared
 from .config import settings
+from .scheduler import retry_after_seconds
+from .storage import load_token_cache, save_token_cache
+from .upstream import get_client
 
 # 단순 토큰 캐시
 _token_cache: Dict[str, Any] = {"access_token": None, "exp": 0}
+_refresh_task: asyncio.Task | None = None   # 진행 중인 갱신(single-flight)
+_renew_task: asyncio.Task | None = None     # 백그라운드 선갱신 루프
 
 def _build_headers() -> Dict[str, str]:
     # 헤더에도 키 제공(호환성↑)
@@ -45,24 +51,25 @@ async def _request_token_once(client: httpx.AsyncClient) -> Dict[str, Any]:
     if isinstance(body, dict):
         token = body.get("access_token") or body.get("accessToken") or body.get("token")
 
-    return {"status": r.status_code, "body": body, "token": token}
+    return {"status": r.status_code, "body": body, "token": token,
+            "retry_after": retry_after_seconds(r)}
 
 async def _request_token_with_retry() -> Dict[str, Any]:
     """
     429(요청 과다), 500(서버 내부오류) 같은 임시 오류에 대해 짧게 재시도.
     """
-    async with httpx.AsyncClient() as client:
-        for attempt in range(3):
-            res = await _request_token_once(client)
-            status = res["status"]
-            if status == 200 and res.get("token"):
-                return {"success": True, "token": res["token"], "last": res}
-            # 임시 오류면 한 번 쉬고 재시도
-            if status in (429, 500):
-                await asyncio.sleep(1.2)
-                continue
-            # 그 외 상태는 재시도 무의미 → 즉시 반환
-            return {"success": False, "last": res}
+    client = get_client()
+    for attempt in range(3):
+        res = await _request_token_once(client)
+        status = res["status"]
+        if status == 200 and res.get("token"):
+            return {"success": True, "token": res["token"], "last": res}
+        # 임시 오류면 쉬고 재시도(Retry-After 우선, 없으면 지수 백오프)
+        if status in (429, 500):
+            await asyncio.sleep(res.get("retry_after") or 0.6 * (2 ** attempt))
+            continue
+        # 그 외 상태는 재시도 무의미 → 즉시 반환
+        return {"success": False, "last": res}
     return {"success": False, "last": {"status": -1, "body": {"error": "NO_RESPONSE"}}}
 
 # /api/token/debug 에서 쓰는 진단용(형식 단순화)
@@ -75,21 +82,155 @@ async def _request_token(client: httpx.AsyncClient) -> Dict[str, Any]:
          "body": res["body"]}
     ]}
 
+def _key_fingerprint() -> str:
+    # 다른 앱키로 발급된 토큰을 디스크에서 잘못 집어오지 않도록
+    return hashlib.sha256(f"{settings.base_url}|{settings.app_key}".encode()).hexdigest()[:16]
+
+def _cache_valid(now: float) -> bool:
+    return bool(_token_cache["access_token"]) and _token_cache["exp"] > now + 60
+
+async def _adopt_shared(newer_than: float = 0.0) -> bool:
+    """공유 저장소(SHARED_STATE)에 더 늦게 만료되는 토큰이 있으면 메모리로 올림."""
+    data = await shared.get("token", _key_fingerprint())
+    if not data:
+        return False
+    exp = float(data.get("exp") or 0)
+    if data.get("access_token") and exp > max(newer_than, time.time() + 60):
+        _token_cache["access_token"] = data["access_token"]
+        _token_cache["exp"] = exp
+        return True
+    return False
+
+async def _load_persisted() -> bool:
+    """공유 저장소/디스크(다른 워커/이전 프로세스)에 유효한 토큰이 있으면 메모리로 올림."""
+    if await _adopt_shared():
+        return True
+    if not settings.TOKEN_PERSIST:
+        return False
+    data = await load_token_cache()
+    if data.get("fp") != _key_fingerprint():
+        return False
+    token, exp = data.get("access_token"), float(data.get("exp") or 0)
+    if token and exp > time.time() + 60:
+        _token_cache["access_token"] = token
+        _token_cache["exp"] = exp
+        return True
+    return False
+
+def _expiry_from(body: Any, now: float) -> float:
+    """만료 시각: expires_in(초) 또는 키움 expires_dt(YYYYMMDDHHMMSS, 현지 시각). 둘 다 없으면 TOKEN_TTL."""
+    exp = now + settings.TOKEN_TTL
+    if isinstance(body, dict):
+        try:
+            exp = min(exp, now + float(body.get("expires_in")))
+        except (TypeError, ValueError):
+            pass
+        try:
+            exp = min(exp, time.mktime(time.strptime(str(body.get("expires_dt")), "%Y%m%d%H%M%S")))
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return exp
+
+async def _refresh() -> Dict[str, Any]:
+    # 워커 간에도 발급은 1번만: 락을 잡은 뒤 다른 워커가 이미 새 토큰을 올렸는지 확인
+    had = _token_cache["exp"]
+    async with shared.lease("token:" + _key_fingerprint(), ttl=30.0):
+        if await _adopt_shared(newer_than=had):
+            metrics.TOKEN_REFRESH.inc("shared")
+            return {"success": True, "token": _token_cache["access_token"],
+                    "last": {"status": 200, "body": {"source": "shared"}}}
+        return await _refresh_locked()
+
+async def _refresh_locked() -> Dict[str, Any]:
+    now = time.time()
+    t0 = time.perf_counter()
+    try:
+        result = await _request_token_with_retry()
+    except Exception:
+        metrics.TOKEN_REFRESH.inc("error")
+        raise
+    finally:
+        metrics.TOKEN_REFRESH_LATENCY.observe(time.perf_counter() - t0)
+    metrics.TOKEN_REFRESH.inc("ok" if result["success"] else "fail")
+    if result["success"]:
+        _token_cache["access_token"] = result["token"]
+        _token_cache["exp"] = _expiry_from(result["last"].get("body"), now)
+        await shared.put("token", _key_fingerprint(), dict(_token_cache), ttl=_token_cache["exp"] - time.time())
+        if settings.TOKEN_PERSIST:
+            try:
+                await save_token_cache({**_token_cache, "fp": _key_fingerprint()})
+            except Exception:
+                pass  # 디스크 저장 실패는 메모리 캐시로 계속 진행
+    return result
+
+def _refresh_shared() -> asyncio.Task:
+    """
+    single-flight: 진행 중인 갱신이 있으면 그 Task를 같이 기다림.
+    (만료 순간 몰린 주문들이 각자 /oauth2/token 을 치지 않도록)
+    """
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.ensure_future(_refresh())
+    return _refresh_task
+
 async def get_token(debug: bool = False) -> str:
     """
     성공 시 토큰 캐시(약 50분). debug=True면 실패 시 빈 문자열 반환.
     """
-    now = time.time()
-    if _token_cache["access_token"] and _token_cache["exp"] > now + 60:
+    if _cache_valid(time.time()) or await _load_persisted():
         return _token_cache["access_token"]
 
-    result = await _request_token_with_retry()
+    # shield: 기다리던 요청 하나가 취소돼도 공유 갱신은 계속
+    t0 = time.perf_counter()
+    try:
+        result = await asyncio.shield(_refresh_shared())
+    finally:
+        metrics.add_timing("auth", time.perf_counter() - t0)
     if result["success"]:
-        token = result["token"]
-        _token_cache["access_token"] = token
-        _token_cache["exp"] = now + 60 * 50
-        return token
+        return result["token"]
 
     if debug:
         return ""
     raise RuntimeError(f"Token request failed: {result.get('last')}")
+
+# -----------------------
+# 백그라운드 선갱신 (요청 경로가 토큰 발급을 기다리지 않도록)
+# -----------------------
+_MIN_RENEW_GAP = 10.0   # 갱신 사이 최소 간격(초) — 수명이 짧은 토큰이 와도 연속 발급하지 않도록
+
+async def _renew_loop() -> None:
+    last = 0.0
+    while True:
+        if not _cache_valid(time.time()):
+            await _load_persisted()
+        now = time.time()
+        # 미리 갱신 시간은 남은 수명의 절반까지만(수명 <= TOKEN_RENEW_AHEAD 여도 바로 재발급 반복 안 함)
+        ahead = min(settings.TOKEN_RENEW_AHEAD, max(0.0, _token_cache["exp"] - now) / 2)
+        wait = max(_token_cache["exp"] - ahead - now, last + _MIN_RENEW_GAP - now)
+        if wait > 0:
+            await asyncio.sleep(wait)
+            # 자는 동안 다른 워커가 갱신했으면 그걸 사용
+            if await _load_persisted() and _token_cache["exp"] - ahead > time.time():
+                continue
+        last = time.time()
+        try:
+            result = await _refresh_shared()
+        except Exception:
+            result = {"success": False}
+        if not result["success"]:
+            await asyncio.sleep(30)
+
+def start_renewer() -> None:
+    global _renew_task
+    if _renew_task is None or _renew_task.done():
+        _renew_task = asyncio.ensure_future(_renew_loop())
+
+async def stop_renewer() -> None:
+    global _renew_task
+    if _renew_task is not None:
+        _renew_task.cancel()
+        try:
+            await _renew_task
+        except asyncio.CancelledError:
+            pass
+        _renew_task = None
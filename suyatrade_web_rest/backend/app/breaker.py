@@ -0,0 +1,188 @@
+# backend/app/breaker.py
+"""
+브로커 호출 보호: 엔드포인트(api_id/tr_id)별 서킷 브레이커 + 적응형 타임아웃 + 헤징.
+
+- closed → (연속 실패 BREAKER_FAILURES 회) → open: BREAKER_OPEN_SECONDS 동안 즉시 실패
+- open → half_open: 시험 호출 1건만 통과, 성공하면 closed / 실패하면 다시 open
+- 타임아웃: 최근 지연 p99 × BREAKER_TIMEOUT_MULT (HTTP_TIMEOUT 상한, BREAKER_TIMEOUT_MIN 하한)
+  주문(adaptive=False)은 고정 HTTP_TIMEOUT — 끊어도 이미 접수됐을 수 있으므로 짧게 자르지 않음
+- 헤징(조회 전용): p95 를 넘겨도 응답이 없으면 같은 요청을 1번 더 보내 먼저 온 것을 사용
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict
+
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 이 샘플 수 전에는 고정 타임아웃(HTTP_TIMEOUT) 사용
+_MIN_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"circuit open for {key} (retry in {retry_in:.1f}s)")
+        self.key = key
+        self.retry_in = retry_in
+
+
+class UpstreamTimeout(Exception):
+    def __init__(self, key: str, timeout: float):
+        super().__init__(f"upstream {key} timed out after {timeout:.2f}s")
+        self.key = key
+        self.timeout = timeout
+
+
+class Breaker:
+    def __init__(self, key: str):
+        self.key = key
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_inflight = False
+        self._lat: deque[float] = deque(maxlen=200)
+        self._pcts: tuple[float, float] | None = None   # (p95, p99) 캐시
+        self._stats = {"ok": 0, "fail": 0, "rejected": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0}
+
+    # ── 상태 ────────────────────────────────────────────────────────────────
+    def before_call(self) -> None:
+        if self.state == OPEN:
+            left = self.opened_at + settings.BREAKER_OPEN_SECONDS - time.monotonic()
+            if left > 0:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.key, left)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probe_inflight:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.key, settings.BREAKER_OPEN_SECONDS)
+            self.probe_inflight = True
+
+    def on_success(self, latency: float) -> None:
+        self._stats["ok"] += 1
+        self._lat.append(latency)
+        if len(self._lat) % 10 == 0:
+            self._pcts = None
+        self.failures = 0
+        self.state = CLOSED
+        self.probe_inflight = False
+
+    def on_failure(self) -> None:
+        self._stats["fail"] += 1
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= settings.BREAKER_FAILURES:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self.probe_inflight = False
+
+    # ── 지연 기반 값 ────────────────────────────────────────────────────────
+    def _percentiles(self) -> tuple[float, float] | None:
+        if len(self._lat) < _MIN_SAMPLES:
+            return None
+        if self._pcts is None:
+            s = sorted(self._lat)
+            self._pcts = (s[int(len(s) * 0.95) - 1], s[int(len(s) * 0.99) - 1])
+        return self._pcts
+
+    def timeout(self) -> float:
+        p = self._percentiles()
+        if p is None:
+            return settings.HTTP_TIMEOUT
+        return min(settings.HTTP_TIMEOUT, max(settings.BREAKER_TIMEOUT_MIN, p[1] * settings.BREAKER_TIMEOUT_MULT))
+
+    def hedge_delay(self) -> float | None:
+        p = self._percentiles()
+        return None if p is None else p[0]
+
+    def stats(self) -> Dict[str, Any]:
+        p = self._percentiles()
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "timeout_s": round(self.timeout(), 3),
+            "p95_ms": round(p[0] * 1000, 1) if p else None,
+            "p99_ms": round(p[1] * 1000, 1) if p else None,
+            **self._stats,
+        }
+
+    # ── 호출 ────────────────────────────────────────────────────────────────
+    async def call(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        is_failure: Callable[[Any], bool],
+        can_hedge: Callable[[], bool] | None = None,
+        adaptive: bool = True,
+    ) -> Any:
+        """
+        before_call() 은 호출 측에서 미리(대기열 진입 전) 불러 둔 상태여야 함.
+        can_hedge 가 주어지면(조회) 헤징 허용 — 추가 슬롯을 즉시 얻을 수 있을 때만.
+        adaptive=False(주문)면 지연 통계와 무관하게 HTTP_TIMEOUT.
+        """
+        t0 = time.perf_counter()
+        timeout = self.timeout() if adaptive else settings.HTTP_TIMEOUT
+        try:
+            res = await asyncio.wait_for(self._maybe_hedged(call, can_hedge), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            self.on_failure()
+            raise UpstreamTimeout(self.key, timeout) from None
+        except asyncio.CancelledError:
+            self.probe_inflight = False
+            raise
+        except Exception:
+            self.on_failure()
+            raise
+        if is_failure(res):
+            self.on_failure()
+        else:
+            self.on_success(time.perf_counter() - t0)
+        return res
+
+    async def _maybe_hedged(self, call, can_hedge) -> Any:
+        delay = self.hedge_delay() if (can_hedge and settings.BREAKER_HEDGE) else None
+        if delay is None:
+            return await call()
+        first = asyncio.ensure_future(call())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not can_hedge():
+                return await first
+            self._stats["hedged"] += 1
+            second = asyncio.ensure_future(call())
+            tasks.add(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                ok = [f for f in done if f.exception() is None]
+                if ok:
+                    if ok[0] is second:
+                        self._stats["hedge_wins"] += 1
+                    return ok[0].result()
+                if not pending:
+                    return done.pop().result()  # 둘 다 실패 → 예외 전달
+        finally:
+            # 진 쪽/타임아웃으로 버려진 요청 정리
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+
+_breakers: Dict[str, Breaker] = {}
+
+
+def get(key: str) -> Breaker:
+    b = _breakers.get(key)
+    if b is None:
+        b = _breakers[key] = Breaker(key)
+    return b
+
+
+def stats() -> Dict[str, Any]:
+    return {k: b.stats() for k, b in _breakers.items()}
@@ -11,11 +11,150 @@ class Settings(BaseSettings):
     ACNT_PRDT_CD: str = "01"
     DEBUG: int = 0
 
+    # 업스트림 HTTP 풀 (프로세스 전역 클라이언트 1개)
+    HTTP2: int = 1                       # 1이면 HTTP/2 사용(h2 미설치 시 자동으로 1.1)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # 유휴 커넥션 유지(초)
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_TIMEOUT: float = 10.0           # read/write/pool 기본 타임아웃(초)
+
+    # 토큰 (발급 후 약 50분 유효로 간주, 만료 전에 백그라운드 갱신)
+    TOKEN_TTL: int = 60 * 50
+    TOKEN_RENEW_AHEAD: int = 60 * 5      # 만료 몇 초 전에 미리 갱신할지
+    TOKEN_PERSIST: int = 1               # 1이면 data/token_cache.json 에 저장
+
+    # 후보 엔드포인트(_try_many) 학습 캐시
+    ENDPOINT_FAIL_THRESHOLD: int = 2     # 연속 실패 몇 번이면 차단할지
+    ENDPOINT_NEG_TTL: float = 600.0      # 차단 유지(초)
+    ENDPOINT_HEDGE: int = 0              # 1이면 캐시 없을 때 후보 동시 시도
+
+    # /api/account/summary 캐시(초)
+    SUMMARY_TTL: float = 2.0             # 이 안에서는 캐시 그대로 응답
+    SUMMARY_STALE: float = 30.0          # 이 안에서는 캐시 응답 + 백그라운드 갱신
+
+    # 일괄 주문(/orders/stock/batch) 기본 동시 전송 수
+    BATCH_CONCURRENCY: int = 8
+
+    # 업스트림 호출 스케줄러(토큰버킷, 0이면 제한 없음)
+    RATE_LIMIT_RPS: float = 5.0          # api_id/tr_id 별 초당 호출
+    RATE_LIMIT_BURST: float = 5.0
+    RATE_LIMIT_GLOBAL_RPS: float = 10.0  # 앱키 전체 초당 호출
+    RATE_LIMIT_GLOBAL_BURST: float = 10.0
+    RATE_LIMIT_RETRIES: int = 2          # 429 재시도 횟수
+
+    # 주문 멱등성 저장소(x-idempotency-key)
+    IDEMPOTENCY_MAX: int = 10000
+    IDEMPOTENCY_TTL: float = 60 * 60 * 24
+    IDEMPOTENCY_PERSIST: int = 0         # 1이면 data/idempotency.ndjson 에 기록
+
+    # 계좌 푸시(/api/stream/account) 서버 폴링 간격(초)
+    STREAM_POLL_INTERVAL: float = 3.0
+
+    # 주문 저널(data/journal) — 그룹 커밋
+    JOURNAL_ENABLED: int = 1
+    JOURNAL_FLUSH_MS: float = 20.0       # 이 시간 동안 모아서 한 번에 fsync
+    JOURNAL_BATCH: int = 512             # 한 번에 쓰는 최대 건수
+
+    # 서킷 브레이커 / 적응형 타임아웃 (api_id/tr_id 별)
+    BREAKER_FAILURES: int = 5            # 연속 실패 몇 번이면 open
+    BREAKER_OPEN_SECONDS: float = 10.0   # open 유지 후 half-open 시험
+    BREAKER_TIMEOUT_MULT: float = 3.0    # 타임아웃 = p99 × 배수
+    BREAKER_TIMEOUT_MIN: float = 1.0
+    BREAKER_HEDGE: int = 1               # 조회는 p95 초과 시 1회 헤징
+
+    # 보유종목 연속조회 최대 페이지 수(무한 반복 방지)
+    HOLDINGS_MAX_PAGES: int = 100
+
+    # 로컬 포지션 장부(/api/positions) — 브로커 잔고와 대사 주기(초), 0이면 끔
+    POSITION_RECONCILE_SECONDS: float = 30.0
+
+    # 다계좌: "계좌번호-상품코드" 콤마 구분(비우면 ACCOUNT_NO/ACNT_PRDT_CD 1개)
+    ACCOUNTS: str = ""
+    PORTFOLIO_CONCURRENCY: int = 4       # /api/portfolio 동시 조회 계좌 수
+    PORTFOLIO_DEADLINE: float = 5.0      # 이 시간 안에 못 끝낸 계좌는 결과에서 timeout 처리
+
+    # 시세(/api/quotes) — 종목별 캐시 + 묶음 조회
+    QUOTE_TTL: float = 1.0               # 캐시 유효(초)
+    QUOTE_BATCH: int = 100               # 업스트림 1회에 묶는 최대 종목 수
+    QUOTE_BATCH_WINDOW_MS: float = 5.0   # 이 시간 동안 들어온 요청의 종목을 모아 한 번에
+    QUOTE_MAX_CODES: int = 500           # 요청 1건당 최대 종목 수
+    QUOTE_CACHE_MAX: int = 5000
+
+    # 주문 전 로컬 검증(호가단위/가격제한폭/주문가능금액/보유수량)
+    PRETRADE_ENABLED: int = 1
+    PRETRADE_PRICE_BAND: float = 0.30    # 전일종가 대비 ±30%
+    PRETRADE_MAX_AMOUNT: int = 0         # 1건 주문금액 상한(원), 0이면 끔
+    PRETRADE_QUOTE_MAX_AGE: float = 30.0 # 가격제한폭/시장가 금액 추정에 쓸 시세의 최대 나이(초), 넘으면 검사 생략
+
+    # 워커 간 공유 상태(토큰/요약 캐시/엔드포인트 학습/멱등성)
+    SHARED_STATE: str = "memory"         # memory=공유 안 함, sqlite=data/shared.sqlite3 공유(--workers N 용)
+    SHARED_STATE_PATH: str = ""          # sqlite 파일 경로(비우면 data/shared.sqlite3)
+
+    # 기동 예열(/api/ready) + 선택 라우터
+    WARMUP_ENABLED: int = 1
+    WARMUP_CONNECTIONS: int = 4          # 미리 열어 둘 업스트림 커넥션 수
+    WARMUP_TIMEOUT: float = 20.0         # 이 안에 못 끝내도 ready 로 전환
+    ROUTERS_DISABLED: str = ""           # 끌 선택 라우터(콤마): stream,portfolio,quotes,orders,algo (orders 끄면 algo 도 꺼짐)
+
+    # 텔레그램 알림(백그라운드 배치 전송)
+    TELEGRAM_API_BASE: str = "https://api.telegram.org"
+    NOTIFY_QUEUE_MAX: int = 1000         # 대기열 상한(넘치면 버리고 "N건 생략" 요약)
+    NOTIFY_DIGEST_MS: float = 1000.0     # 이 시간 동안 모인 이벤트를 메시지 1개로
+    NOTIFY_MIN_INTERVAL: float = 1.0     # 전송 최소 간격(초)
+
+    # 대시보드 정적 파일(/web): 기동 시 gzip/brotli 미리 압축 + 해시 이름/ETag 캐시
+    STATIC_PRECOMPRESS: int = 1          # 0 이면 기존 StaticFiles 그대로
+    STATIC_MIN_COMPRESS: int = 256       # 이보다 작은 파일은 압축 안 함(bytes)
+
+    # 업스트림 녹화/재생(오프라인 성능 재현): 경로가 .gz 면 압축
+    UPSTREAM_RECORD: str = ""            # 요청/응답/지연을 이 파일에 기록
+    UPSTREAM_REPLAY: str = ""            # 지정하면 네트워크 대신 이 녹화본으로 응답
+    REPLAY_SPEED: float = 1.0            # 1=녹화 지연 그대로, 0=대기 없이
+
+    # 모주문 분할 실행(TWAP/아이스버그, /api/algo/orders)
+    SLICE_TICK_MS: int = 100             # 타이머 휠 한 칸
+    SLICE_WHEEL_SLOTS: int = 600         # 휠 칸 수(넘는 지연은 바퀴 수로 셈)
+    SLICE_MAX_ACTIVE: int = 500          # 동시에 진행할 수 있는 모주문 수
+    SLICE_MAX_INFLIGHT: int = 4          # 동시에 전송 중인 자식 주문 수(전체)
+    SLICE_MIN_INTERVAL: float = 1.0      # 자식 간 최소 간격(초)
+    SLICE_DEFAULT_INTERVAL: float = 10.0 # interval 미지정 시 TWAP 간격(초)
+    SLICE_MAX_ERRORS: int = 3            # 연속 실패 시 모주문 중단
+    SLICE_KEEP_DONE: int = 200           # 끝난 모주문 보관 수
+
     # 내부에서 통일해서 쓰기 위한 별칭
     @property
     def base_url(self) -> str:
         return self.MOCK_BASE_URL
 
+    @property
+    def app_key(self) -> str:
+        return self.APP_KEY
+
+    @property
+    def app_secret(self) -> str:
+        return self.APP_SECRET
+
+    @property
+    def account_no(self) -> str:
+        return self.ACCOUNT_NO
+
+    @property
+    def acnt_prdt_cd(self) -> str:
+        return self.ACNT_PRDT_CD
+
+    @property
+    def accounts(self) -> list[tuple[str, str]]:
+        """[(계좌번호, 상품코드), ...] — 첫 번째가 기본 계좌."""
+        out = []
+        for item in self.ACCOUNTS.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            cano, _, prdt = item.partition("-")
+            out.append((cano.strip(), prdt.strip() or self.ACNT_PRDT_CD))
+        return out or [(self.ACCOUNT_NO, self.ACNT_PRDT_CD)]
+
     # pydantic-settings v2 방식
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).resolve().parents[1] / ".env"),
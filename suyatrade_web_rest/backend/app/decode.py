@@ -0,0 +1,243 @@
+# backend/app/decode.py
+"""
+브로커 응답 디코더 (스키마 기반, 별칭 매핑 캐시).
+
+- 필드마다 별칭 후보(한글/영문 키)를 우선순위대로 선언
+- 엔드포인트별로 "실제로 쓰는 키"를 처음 한 번만 찾아 캐시 → 이후엔 바로 꺼내서 변환
+  (캐시된 키가 응답에 없으면 그때만 다시 찾음. 못 찾은 필드가 있는 계획은 캐시하지 않음
+   → 첫 본문이 에러/빈 본문이어도 "전부 없음"이 굳지 않음)
+- 결과는 __slots__ 레코드(작고 빠름), as_dict() 로 응답 변환
+- JSON 은 orjson 이 있으면 사용(없으면 표준 json) — 라우트 응답도 FastJSONResponse(앱 기본 응답 클래스)로
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 빠른 JSON
+# ───────────────────────────────────────────────────────────────────────────────
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """한 줄 JSON(NDJSON 용, 한글 그대로)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumpb(obj: Any) -> bytes:
+    """응답 본문용 bytes(숫자 dict 키 허용)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse 와 같지만 본문 직렬화를 dumpb(orjson)로."""
+
+    def render(self, content: Any) -> bytes:
+        return dumpb(content)
+
+
+def response_json(r) -> Dict[str, Any]:
+    """httpx 응답 → dict (JSON 아니거나 깨졌으면 빈 dict)."""
+    if not r.headers.get("content-type", "").startswith("application/json"):
+        return {}
+    try:
+        body = loads(r.content)
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 값 변환
+# ───────────────────────────────────────────────────────────────────────────────
+def to_int(v: Any) -> int:
+    if type(v) is int:
+        return v
+    try:
+        if isinstance(v, str):
+            v = v.replace(",", "").strip()
+        return int(float(v))
+    except Exception:
+        return 0
+
+
+def to_float(v: Any) -> float:
+    if type(v) is float:
+        return v
+    try:
+        if isinstance(v, str):
+            v = v.replace("%", "").replace(",", "").strip()
+        return float(v)
+    except Exception:
+        return 0.0
+
+
+def to_str(v: Any) -> str:
+    return "" if v is None else str(v)
+
+
+def to_price(v: Any) -> int:
+    """시세 가격: 키움은 등락 부호를 붙여 줌("+70000", "-69000") → 절대값."""
+    return abs(to_int(v))
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 레코드
+# ───────────────────────────────────────────────────────────────────────────────
+class Record:
+    __slots__ = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class DepositRecord(Record):
+    __slots__ = ("deposit", "orderable")
+
+
+class BalanceRecord(Record):
+    __slots__ = ("total_purchase", "total_eval", "total_pl", "total_return", "today_realized")
+
+
+class HoldingRecord(Record):
+    __slots__ = ("code", "name", "qty", "avg_price", "price", "eval", "pl")
+
+
+class QuoteRecord(Record):
+    __slots__ = ("code", "name", "price", "change", "rate", "volume")
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 스키마
+# ───────────────────────────────────────────────────────────────────────────────
+Field = Tuple[str, Tuple[str, ...], Callable[[Any], Any], Any]   # (속성, 별칭들, 변환, 기본값)
+
+
+def _missing(key: Any, body: Dict[str, Any]) -> bool:
+    if isinstance(key, tuple):
+        return any(k not in body for k in key)
+    return key not in body
+
+
+class Schema:
+    def __init__(self, record: type, fields: Iterable[Field], first_nonzero: Iterable[str] = ()):
+        self.record = record
+        self.fields = tuple(fields)
+        # 이 속성들은 "처음 있는 키"가 아니라 "처음 0 이 아닌 값"(있는 별칭을 모두 기억)
+        self.first_nonzero = frozenset(first_nonzero)
+        # endpoint -> ((속성, 실제키|None, 변환, 기본값), ...)
+        self._plans: Dict[Any, tuple] = {}
+        self.stats = {"decoded": 0, "resolved": 0}
+
+    def _resolve(self, body: Dict[str, Any]) -> tuple:
+        self.stats["resolved"] += 1
+        plan = []
+        for attr, aliases, conv, default in self.fields:
+            if attr in self.first_nonzero:
+                key: Any = tuple(a for a in aliases if a in body) or None
+            else:
+                key = next((a for a in aliases if a in body), None)
+            plan.append((attr, key, conv, default))
+        return tuple(plan)
+
+    def decode(self, body: Dict[str, Any], endpoint: Any = None):
+        plan = self._plans.get(endpoint)
+        if plan is None or any(_missing(k, body) for _, k, _, _ in plan):
+            plan = self._resolve(body)
+            # 모든 필드가 풀린 계획만 캐시. 빠진 필드가 있으면(에러 본문/{} 등) 다음 본문에서 다시 찾음
+            if all(k is not None for _, k, _, _ in plan):
+                self._plans[endpoint] = plan
+            else:
+                self._plans.pop(endpoint, None)
+        self.stats["decoded"] += 1
+        rec = self.record.__new__(self.record)
+        for attr, key, conv, default in plan:
+            if key is None:
+                val = default
+            elif isinstance(key, tuple):
+                vals = [conv(body[k]) for k in key]
+                val = next((v for v in vals if v), vals[0])
+            else:
+                val = conv(body[key])
+            setattr(rec, attr, val)
+        return rec
+
+
+# kiwoom 계좌 API (kt00001 / kt00017)
+DEPOSIT = Schema(DepositRecord, (
+    ("deposit", ("예수금", "deposit", "DEPOSIT"), to_int, 0),
+    ("orderable", ("주문가능금액", "orderable_cash", "ORD_PSB"), to_int, 0),
+))
+
+BALANCE = Schema(BalanceRecord, (
+    ("total_purchase", ("총매입금액", "total_purchase"), to_int, 0),
+    ("total_eval", ("총평가금액", "total_eval"), to_int, 0),
+    ("total_pl", ("총평가손익금액", "total_pl"), to_int, 0),
+    ("total_return", ("총수익률(%)", "total_return"), to_float, 0.0),
+    ("today_realized", ("당일실현손익", "today_realized_pl"), to_int, 0),
+))
+
+# inquire-balance output1 합계 행 / psbl-deposit output
+KIS_BALANCE = Schema(BalanceRecord, (
+    ("total_purchase", ("pchs_amt_smtby",), to_int, 0),
+    ("total_eval", ("tot_evlu_amt",), to_int, 0),
+    ("total_pl", ("evlu_pfls_smtby",), to_int, 0),
+    ("total_return", ("evlu_erng_rt",), to_float, 0.0),
+    ("today_realized", ("prdy_cprs_pl", "thdt_pnl_amt", "tdts_unstt_amt"), to_int, 0),
+), first_nonzero=("today_realized",))
+
+KIS_BALANCE_CASH = Schema(DepositRecord, (
+    ("deposit", ("dnca_tot_amt",), to_int, 0),
+    ("orderable", ("ord_psbl_cash",), to_int, 0),
+))
+
+KIS_DEPOSIT = Schema(DepositRecord, (
+    ("deposit", ("deposit", "dnca_tot", "dnca_tot_amt_won", "dnca_tot_amt"), to_int, None),
+    ("orderable", ("orderable", "orderable_cash", "ord_psbl_amt", "ord_psbl_cash"), to_int, None),
+))
+
+KIS_HOLDING = Schema(HoldingRecord, (
+    ("code", ("pdno",), to_str, ""),
+    ("name", ("prdt_name",), to_str, ""),
+    ("qty", ("hldg_qty",), to_int, 0),
+    ("avg_price", ("pchs_avg_pric",), to_float, 0.0),
+    ("price", ("prpr",), to_int, 0),
+    ("eval", ("evlu_amt",), to_int, 0),
+    ("pl", ("evlu_pfls_amt",), to_int, 0),
+))
+
+# 관심종목정보(ka10095) atn_stk_infr 행
+QUOTE = Schema(QuoteRecord, (
+    ("code", ("stk_cd",), to_str, ""),
+    ("name", ("stk_nm",), to_str, ""),
+    ("price", ("cur_prc",), to_price, 0),
+    ("change", ("pred_pre",), to_int, 0),
+    ("rate", ("flu_rt",), to_float, 0.0),
+    ("volume", ("trde_qty",), to_int, 0),
+))
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        name: s.stats for name, s in (
+            ("deposit", DEPOSIT), ("balance", BALANCE), ("kis_balance", KIS_BALANCE),
+            ("kis_balance_cash", KIS_BALANCE_CASH), ("kis_deposit", KIS_DEPOSIT),
+            ("kis_holding", KIS_HOLDING), ("quote", QUOTE),
+        )
+    }
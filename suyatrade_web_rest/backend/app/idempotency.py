@@ -0,0 +1,239 @@
+# backend/app/idempotency.py
+"""
+주문 라우트용 서버측 멱등성 저장소 (x-idempotency-key).
+
+- 같은 키 재요청: 저장된 응답을 바로 돌려줌(업스트림 왕복 없음)
+- 같은 키가 처리 중일 때 들어온 중복: 원래 요청 결과를 같이 기다림
+- 결과를 모르는 실패(OutcomeUnknown: 전송 후 타임아웃)는 그 응답을 저장 → 같은 키 재시도가 재전송하지 않음
+- LRU(IDEMPOTENCY_MAX) + TTL(IDEMPOTENCY_TTL)
+- IDEMPOTENCY_PERSIST=1 이면 data/idempotency.ndjson 에 append → 재시작 후에도 유지
+  줄 수가 살아 있는 항목의 2배(+_COMPACT_SLACK)를 넘으면 스레드에서 다시 씀(파일/기동 재생 시간 상한)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from . import shared
+from .config import settings
+from .storage import IDEMPOTENCY_FILE
+
+# 업스트림이 처리하지 않았을 가능성이 큰 응답은 저장하지 않음(재시도 허용)
+_NO_STORE = (429,)
+
+# 압축 기준: 파일 줄 수 > 살아 있는 항목 × 2 + 이 값
+_COMPACT_SLACK = 256
+
+# 다른 워커가 처리 중인 키를 기다리는 최대 시간(이후엔 직접 처리)
+_INFLIGHT_TTL = settings.HTTP_TIMEOUT * 3
+
+
+class IdempotencyConflict(Exception):
+    """같은 키로 다른 내용의 주문이 들어온 경우."""
+
+
+class OutcomeUnknown(Exception):
+    """전송은 됐지만 응답을 못 받음(접수됐을 수 있음). result 는 같은 키 재요청에 돌려줄 응답."""
+
+    def __init__(self, result: Tuple[int, Any, Any]):
+        super().__init__(str(result[1]))
+        self.result = result
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int, ttl: float, path: Path | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()  # key -> (at, fp, value)
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._stats = {"hits": 0, "misses": 0, "joined": 0, "conflicts": 0, "compactions": 0}
+        self._lines = 0                         # 파일의 현재 줄 수(추정)
+        self._compacting = False
+        self._file_lock = threading.Lock()      # append 와 compact 가 스레드에서 겹치지 않도록
+        if path is not None:
+            self._load()
+
+    # ── 디스크 ───────────────────────────────────────────────────────────────
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        now = time.time()
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다 끊긴 마지막 줄 등
+                    if now - rec["at"] < self.ttl:
+                        self._entries[rec["k"]] = (rec["at"], rec["fp"], rec["v"])
+                        self._entries.move_to_end(rec["k"])
+        except Exception:
+            return
+        self._evict(now)
+        self._compact(list(self._entries.items()))
+
+    def _compact(self, rows: list) -> None:
+        """rows: 이벤트 루프에서 떠 둔 (키, 항목) 목록(스레드에서 OrderedDict 를 직접 돌지 않음)."""
+        tmp = self.path.with_suffix(".tmp")
+        with self._file_lock:
+            with tmp.open("w", encoding="utf-8") as f:
+                for k, (at, fp, v) in rows:
+                    f.write(json.dumps({"k": k, "at": at, "fp": fp, "v": v}, ensure_ascii=False) + "\n")
+            tmp.replace(self.path)
+            self._lines = len(rows)
+
+    def _append(self, key: str, at: float, fp: str, value: Any) -> None:
+        line = json.dumps({"k": key, "at": at, "fp": fp, "v": value}, ensure_ascii=False) + "\n"
+        with self._file_lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+            self._lines += 1
+
+    async def _maybe_compact(self) -> None:
+        if self._compacting or self._lines <= len(self._entries) * 2 + _COMPACT_SLACK:
+            return
+        self._compacting = True
+        try:
+            await asyncio.to_thread(self._compact, list(self._entries.items()))
+            self._stats["compactions"] += 1
+        finally:
+            self._compacting = False
+
+    # ── 메모리 ───────────────────────────────────────────────────────────────
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            _, (at, _, _) = next(iter(self._entries.items()))
+            if len(self._entries) > self.max_entries or now - at >= self.ttl:
+                self._entries.popitem(last=False)
+            else:
+                break
+
+    async def get(self, key: str, fp: str) -> Any | None:
+        rec = self._entries.get(key)
+        if rec is None:
+            # 다른 워커가 저장한 응답(SHARED_STATE)
+            rec = await shared.get("idem", key)
+            if rec is None:
+                return None
+            rec = tuple(rec)
+            self._entries[key] = rec
+        at, old_fp, value = rec
+        if time.time() - at >= self.ttl:
+            self._entries.pop(key, None)
+            return None
+        if old_fp != fp:
+            self._stats["conflicts"] += 1
+            raise IdempotencyConflict(key)
+        self._entries.move_to_end(key)
+        return value
+
+    async def _put(self, key: str, fp: str, value: Any) -> None:
+        now = time.time()
+        self._entries[key] = (now, fp, value)
+        self._entries.move_to_end(key)
+        self._evict(now)
+        await shared.put("idem", key, [now, fp, value], ttl=self.ttl)
+        if self.path is not None:
+            try:
+                await asyncio.to_thread(self._append, key, now, fp, value)
+                await self._maybe_compact()
+            except Exception:
+                pass  # 디스크 실패해도 메모리 저장은 유지
+
+    async def run(
+        self,
+        key: str,
+        fp: str,
+        call: Callable[[], Awaitable[Tuple[int, Any, Any]]],
+    ) -> Tuple[Tuple[int, Any, Any], bool]:
+        """
+        ((status, body, headers), replayed) 반환.
+        fp: 요청 내용 지문 — 같은 키에 다른 주문이면 IdempotencyConflict.
+        """
+        stored = await self.get(key, fp)
+        if stored is not None:
+            self._stats["hits"] += 1
+            return tuple(stored), True
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            if pending[0] != fp:
+                self._stats["conflicts"] += 1
+                raise IdempotencyConflict(key)
+            self._stats["joined"] += 1
+            return await asyncio.shield(pending[1]), True
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fp, fut)
+        claimed = False
+        try:
+            other = await self._claim(key, fp)
+            if other is not None:
+                self._stats["joined"] += 1
+                fut.set_result(tuple(other))
+                return tuple(other), True
+            claimed = True
+            self._stats["misses"] += 1
+            result = await call()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except OutcomeUnknown as e:
+            fut.set_result(e.result)
+            await self._put(key, fp, list(e.result))
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # 기다리는 쪽이 없어도 경고 안 나도록
+            raise
+        else:
+            fut.set_result(result)
+            if result[0] not in _NO_STORE and result[0] < 500:
+                await self._put(key, fp, list(result))
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+            if claimed:
+                await shared.delete("idem_inflight", key, fp)
+
+    async def _claim(self, key: str, fp: str) -> Any | None:
+        """
+        워커 간 처리권 확보. 다른 워커가 같은 키를 처리 중이면 저장된 결과가 올라올 때까지 기다려 반환.
+        None 이면 이 워커가 처리(공유 끔이면 항상 None).
+        """
+        deadline = time.monotonic() + _INFLIGHT_TTL
+        while not await shared.add("idem_inflight", key, fp, ttl=_INFLIGHT_TTL):
+            owner_fp = await shared.get("idem_inflight", key)
+            if owner_fp is not None and owner_fp != fp:
+                self._stats["conflicts"] += 1
+                raise IdempotencyConflict(key)
+            await asyncio.sleep(0.05)
+            stored = await self.get(key, fp)
+            if stored is not None:
+                return stored
+            if time.monotonic() > deadline:
+                break
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "persist": self.path is not None,
+            "file_lines": self._lines,
+        }
+
+
+store = IdempotencyStore(
+    settings.IDEMPOTENCY_MAX,
+    settings.IDEMPOTENCY_TTL,
+    IDEMPOTENCY_FILE if settings.IDEMPOTENCY_PERSIST else None,
+)
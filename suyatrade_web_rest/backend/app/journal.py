@@ -0,0 +1,241 @@
+# backend/app/journal.py
+"""
+주문 저널 (append-only NDJSON, 일자별 파일).
+
+쓰기: append() 는 버퍼에 넣고 바로 반환 → 백그라운드 writer 가
+      JOURNAL_FLUSH_MS 동안 모인 기록을 한 번에 write + fsync (group commit)
+읽기: 일자별 사이드카 인덱스(.idx: "오프셋\\t종목코드")로 위치를 찾고
+      mmap 으로 해당 줄만 잘라 파싱 → 수백만 건에서도 페이지 조회가 빠름
+워커 여러 개: 일자별 .lock 파일 락 안에서 실제 파일 크기로 오프셋을 잡고 data/idx 를 씀.
+      idx 쓰기가 실패하면 이번 묶음을 잘라내고(truncate) 다시 시도 → 중복/어긋난 오프셋 없음
+
+  data/journal/orders-20250101.ndjson
+  data/journal/orders-20250101.idx
+  data/journal/orders-20250101.lock
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from .config import settings
+from .storage import JOURNAL_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.localtime(ts))
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """프로세스 간 배타 락(uvicorn --workers N 이 같은 저널 파일에 씀)."""
+    with path.open("a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _DayIndex:
+    __slots__ = ("idx_size", "all", "by_code")
+
+    def __init__(self) -> None:
+        self.idx_size = 0
+        self.all = array("Q")
+        self.by_code: Dict[str, array] = {}
+
+
+class Journal:
+    def __init__(self, root: Path):
+        self.root = root
+        self._buf: List[dict] = []
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._index: Dict[str, _DayIndex] = {}
+        self._index_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stats = {"appended": 0, "flushes": 0, "fsyncs": 0, "max_batch": 0, "errors": 0}
+
+    def _paths(self, day: str) -> tuple[Path, Path]:
+        return self.root / f"orders-{day}.ndjson", self.root / f"orders-{day}.idx"
+
+    # ── 쓰기 ────────────────────────────────────────────────────────────────
+    def append(self, record: dict) -> None:
+        """주문 경로에서 호출. 디스크를 기다리지 않음."""
+        record.setdefault("ts", time.time())
+        self._buf.append(record)
+        self._stats["appended"] += 1
+        if self._wake is not None:
+            self._wake.set()
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        """
+        batch 를 기록. 기록이 끝난 일자의 레코드는 batch 에서 빠짐
+        → 예외가 나면 batch 에 남은 것만 다시 시도하면 됨(중복 없음).
+        """
+        with self._write_lock:
+            self._write_batch_locked(batch)
+
+    def _write_batch_locked(self, batch: List[dict]) -> None:
+        # 스레드에서 실행: 일자별로 묶어서 data/idx 각각 1회 write + fsync
+        by_day: Dict[str, List[dict]] = {}
+        for rec in batch:
+            by_day.setdefault(_day(rec["ts"]), []).append(rec)
+        self.root.mkdir(parents=True, exist_ok=True)
+        for day, recs in by_day.items():
+            data_path, idx_path = self._paths(day)
+            # 오프셋은 락을 잡은 뒤 실제 파일 크기에서(다른 워커가 그 사이에 썼을 수 있음)
+            with _file_lock(self.root / f"orders-{day}.lock"), \
+                    data_path.open("ab") as df, idx_path.open("ab") as xf:
+                data_start = off = os.fstat(df.fileno()).st_size
+                idx_start = os.fstat(xf.fileno()).st_size
+                lines, idx_lines = [], []
+                for rec in recs:
+                    line = (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+                    code = str(rec.get("code", "")).replace("\t", " ").replace("\n", " ")
+                    idx_lines.append(f"{off}\t{code}\n".encode())
+                    lines.append(line)
+                    off += len(line)
+                try:
+                    # 데이터가 먼저 내구화된 뒤에 인덱스를 씀(인덱스가 데이터보다 앞서지 않도록)
+                    df.write(b"".join(lines))
+                    df.flush()
+                    os.fsync(df.fileno())
+                    xf.write(b"".join(idx_lines))
+                    xf.flush()
+                    os.fsync(xf.fileno())
+                except Exception:
+                    # 반쯤 쓴 것은 되돌림(락을 잡고 있으므로 뒤에 다른 워커 기록은 없음) → 재시도해도 중복 없음
+                    for f, size in ((df, data_start), (xf, idx_start)):
+                        try:
+                            f.truncate(size)
+                        except OSError:
+                            pass
+                    raise
+            self._stats["fsyncs"] += 2
+            done = set(map(id, recs))
+            batch[:] = [r for r in batch if id(r) not in done]
+
+    async def _writer(self) -> None:
+        while True:
+            await self._wake.wait()
+            # 모이는 시간(그룹 커밋 창)
+            await asyncio.sleep(settings.JOURNAL_FLUSH_MS / 1000)
+            self._wake.clear()
+            while self._buf:
+                batch = self._buf[: settings.JOURNAL_BATCH]
+                del self._buf[: len(batch)]
+                n = len(batch)
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                except Exception:
+                    # 디스크 오류: 아직 못 쓴 것만 앞에 되돌려 다음 창에 재시도
+                    self._buf[:0] = batch
+                    self._stats["errors"] += 1
+                    await asyncio.sleep(1.0)
+                    self._wake.set()
+                    break
+                self._stats["flushes"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], n)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            if self._buf:
+                self._wake.set()
+            self._task = asyncio.ensure_future(self._writer())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._buf:
+            batch, self._buf = self._buf, []
+            await asyncio.to_thread(self._write_batch, batch)
+
+    # ── 읽기 ────────────────────────────────────────────────────────────────
+    def _refresh_index(self, day: str) -> _DayIndex:
+        _, idx_path = self._paths(day)
+        with self._index_lock:
+            ix = self._index.setdefault(day, _DayIndex())
+            try:
+                size = idx_path.stat().st_size
+            except OSError:
+                return ix
+            if size <= ix.idx_size:
+                return ix
+            # 새로 붙은 꼬리만 읽음
+            with idx_path.open("rb") as f:
+                f.seek(ix.idx_size)
+                chunk = f.read(size - ix.idx_size)
+            end = chunk.rfind(b"\n") + 1  # 쓰다 만 마지막 줄은 다음에
+            for line in chunk[:end].splitlines():
+                off_s, _, code = line.partition(b"\t")
+                off = int(off_s)
+                ix.all.append(off)
+                ix.by_code.setdefault(code.decode(), array("Q")).append(off)
+            ix.idx_size += end
+            return ix
+
+    def query(self, day: str, code: str | None, cursor: int, limit: int, desc: bool = True) -> Dict[str, Any]:
+        ix = self._refresh_index(day)
+        offs = ix.by_code.get(code, array("Q")) if code else ix.all
+        total = len(offs)
+        if desc:
+            picks = [offs[i] for i in range(total - 1 - cursor, max(-1, total - 1 - cursor - limit), -1)]
+        else:
+            picks = list(offs[cursor: cursor + limit])
+        items: List[dict] = []
+        data_path, _ = self._paths(day)
+        if picks:
+            with data_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for off in picks:
+                    end = mm.find(b"\n", off)
+                    items.append(json.loads(mm[off:end if end >= 0 else len(mm)]))
+        nxt = cursor + len(picks)
+        return {
+            "date": day,
+            "code": code,
+            "total": total,
+            "cursor": cursor,
+            "next_cursor": nxt if nxt < total else None,
+            "items": items,
+        }
+
+    def days(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.stem.split("-", 1)[1] for p in self.root.glob("orders-*.ndjson"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "buffered": len(self._buf)}
+
+
+journal = Journal(JOURNAL_DIR)
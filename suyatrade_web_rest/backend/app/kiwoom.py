@@ -1,9 +1,14 @@
 # backend/app/kiwoom.py
 from __future__ import annotations
 
-import httpx
+import asyncio
+import time
+
+from . import decode, metrics, shared
 from .auth import get_token
 from .config import settings
+from .scheduler import ORDER, QUERY, scheduler
+from .upstream import get_client
 
 BASE = settings.base_url.rstrip("/")  # e.g. https://mockapi.kiwoom.com
 JSON_HEADERS = {"content-type": "application/json; charset=UTF-8"}
@@ -19,9 +24,16 @@ def _std_headers(api_id: str, token: str) -> dict:
     }
 
 
-async def _post_json(path: str, api_id: str, payload: dict, extra_headers: dict | None = None):
+async def _post_json(
+    path: str,
+    api_id: str,
+    payload: dict,
+    extra_headers: dict | None = None,
+    priority: int = QUERY,
+):
     """
     공통 POST(JSON). (status, body, headers) 반환
+    스케줄러(api_id 별 토큰버킷, 주문 우선)를 거쳐 전송.
     """
     token = await get_token()
     url = f"{BASE}{path}"
@@ -29,41 +41,152 @@ async def _post_json(path: str, api_id: str, payload: dict, extra_headers: dict
     if extra_headers:
         headers.update(extra_headers)
 
-    async with httpx.AsyncClient(timeout=10.0, verify=True) as client:
-        r = await client.post(url, headers=headers, json=payload)
+    client = get_client()
+    r = await scheduler.run(
+        api_id, priority, lambda: client.post(url, headers=headers, json=payload)
+    )
 
     try:
-        body = r.json()
-    except Exception:
+        body = decode.loads(r.content)
+    except ValueError:
         body = {"raw": r.text}
     return r.status_code, body, dict(r.headers)
 
 
+# ───────────────────────────────────────────────────────────────────────────────
+# 후보 엔드포인트 학습 캐시
+#   - 그룹(후보 목록)별로 마지막 성공 (path, api_id) 를 기억해 먼저 시도
+#   - 연속 실패한 후보는 ENDPOINT_NEG_TTL 동안 건너뜀(전부 막혔으면 그래도 시도)
+#   - ENDPOINT_HEDGE=1 이면 캐시가 비었을 때 남은 후보를 동시에 찔러봄
+# ───────────────────────────────────────────────────────────────────────────────
+Endpoint = tuple[str, str]
+
+_resolved: dict[tuple[Endpoint, ...], Endpoint] = {}
+_failures: dict[Endpoint, list[float]] = {}   # endpoint -> [연속실패수, 차단만료시각]
+_ep_stats = {"hits": 0, "misses": 0, "probes": 0, "probes_saved": 0, "negative_skips": 0}
+
+# 워커 간 공유(SHARED_STATE) 시 학습 결과 유지 시간
+_MEMO_TTL = 60 * 60 * 24.0
+
+# 엔드포인트 문제로 보기 어려운 상태(토큰/과부하)는 실패로 세지 않음
+_TRANSIENT = (401, 403, 429)
+
+
+def _mark(endpoint: Endpoint, ok: bool) -> None:
+    if ok:
+        _failures.pop(endpoint, None)
+        return
+    rec = _failures.setdefault(endpoint, [0, 0.0])
+    rec[0] += 1
+    if rec[0] >= settings.ENDPOINT_FAIL_THRESHOLD:
+        rec[1] = time.monotonic() + settings.ENDPOINT_NEG_TTL
+
+
+def _blocked(endpoint: Endpoint, now: float) -> bool:
+    rec = _failures.get(endpoint)
+    return bool(rec) and rec[1] > now
+
+
+def _memo_key(key: tuple[Endpoint, ...]) -> str:
+    return "|".join(f"{p}#{a}" for p, a in key)
+
+
+async def _ordered(candidates: list[Endpoint]) -> tuple[list[Endpoint], Endpoint | None]:
+    key = tuple(candidates)
+    hit = _resolved.get(key)
+    if hit is None and shared.enabled:
+        # 다른 워커가 이미 찾아 둔 성공 후보
+        memo = await shared.get("endpoint", _memo_key(key))
+        if memo and tuple(memo) in candidates:
+            hit = _resolved[key] = tuple(memo)
+    now = time.monotonic()
+    rest = [c for c in candidates if c != hit and not _blocked(c, now)]
+    skipped = len(candidates) - len(rest) - (1 if hit else 0)
+    _ep_stats["negative_skips"] += skipped
+    if hit:
+        _ep_stats["hits"] += 1
+        _ep_stats["probes_saved"] += candidates.index(hit)
+        return [hit, *rest], hit
+    _ep_stats["misses"] += 1
+    if not rest:
+        # 전부 차단 상태면 원래 순서대로 다시 확인
+        rest = list(candidates)
+    return rest, None
+
+
+async def _probe(endpoint: Endpoint, payload: dict) -> tuple[Endpoint, int, dict, dict]:
+    _ep_stats["probes"] += 1
+    status, body, headers = await _post_json(endpoint[0], endpoint[1], payload)
+    metrics.ENDPOINT_PROBES.inc(endpoint[0], endpoint[1], str(status))
+    if status not in _TRANSIENT:
+        _mark(endpoint, status == 200)
+    return endpoint, status, body, headers
+
+
+def endpoint_stats() -> dict:
+    """엔드포인트 학습 캐시 상태(진단용)."""
+    now = time.monotonic()
+    return {
+        **_ep_stats,
+        "resolved": {"|".join(p for p, _ in k): list(v) for k, v in _resolved.items()},
+        "blocked": [list(ep) for ep in _failures if _blocked(ep, now)],
+    }
+
+
 async def _try_many(candidates: list[tuple[str, str]], payload: dict) -> dict:
     """
-    여러 후보 (path, api_id) 를 순차 시도.
+    여러 후보 (path, api_id) 를 순차 시도. (학습된 성공 후보를 먼저)
     성공 시: {"ok": True, "status": 200, "body": ..., "headers": ..., "endpoint": (path, api_id)}
     실패 시: {"ok": False, "status": 마지막상태, "body": 마지막본문, "trace": [각 시도 결과...]}
     """
+    key = tuple(candidates)
+    order, hit = await _ordered(candidates)
     trace: list[dict] = []
     last_status = None
     last_body = None
     last_headers = None
     last_endpoint = None
 
-    for path, api_id in candidates:
-        status, body, headers = await _post_json(path, api_id, payload)
-        trace.append({"path": path, "api_id": api_id, "status": status, "body": body})
-        last_status, last_body, last_headers, last_endpoint = status, body, headers, (path, api_id)
+    async def _done(endpoint, status, body, headers) -> dict | None:
+        trace.append({"path": endpoint[0], "api_id": endpoint[1], "status": status, "body": body})
         if status == 200:
+            if _resolved.get(key) != endpoint:
+                await shared.put("endpoint", _memo_key(key), list(endpoint), ttl=_MEMO_TTL)
+            _resolved[key] = endpoint
             return {
                 "ok": True,
                 "status": status,
                 "body": body,
                 "headers": headers,
-                "endpoint": (path, api_id),
+                "endpoint": endpoint,
                 "trace": trace,
             }
+        if endpoint == _resolved.get(key):
+            _resolved.pop(key, None)
+            await shared.delete("endpoint", _memo_key(key))
+        return None
+
+    if hit is None and settings.ENDPOINT_HEDGE and len(order) > 1:
+        # 콜드 캐시: 동시에 찔러보고 가장 먼저 성공한 후보 채택
+        tasks = [asyncio.ensure_future(_probe(ep, payload)) for ep in order]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                endpoint, status, body, headers = await fut
+                last_status, last_body, last_headers, last_endpoint = status, body, headers, endpoint
+                res = await _done(endpoint, status, body, headers)
+                if res:
+                    return res
+        finally:
+            for t in tasks:
+                t.cancel()
+        order = []
+
+    for endpoint in order:
+        endpoint, status, body, headers = await _probe(endpoint, payload)
+        last_status, last_body, last_headers, last_endpoint = status, body, headers, endpoint
+        res = await _done(endpoint, status, body, headers)
+        if res:
+            return res
 
     return {
         "ok": False,
@@ -107,7 +230,7 @@ async def order_cash(
     if idempotency_key:
         headers["x-idempotency-key"] = idempotency_key
 
-    return await _post_json(ORDER_PATH, api_id, payload, headers)
+    return await _post_json(ORDER_PATH, api_id, payload, headers, priority=ORDER)
 
 
 # ───────────────────────────────────────────────────────────────────────────────
@@ -137,69 +260,50 @@ def _acct_payload() -> dict:
     }
 
 
-def _pick_first(d: dict, keys: list[str], default=0):
-    for k in keys:
-        if k in d:
-            return d[k]
-    return default
-
-
-def _to_int(v) -> int:
-    try:
-        if isinstance(v, str):
-            v = v.replace(",", "").strip()
-        return int(float(v))
-    except Exception:
-        return 0
-
-
-def _to_float(v) -> float:
-    try:
-        if isinstance(v, str):
-            v = v.replace("%", "").replace(",", "").strip()
-        return float(v)
-    except Exception:
-        return 0.0
-
-
-async def fetch_deposit() -> dict:
+async def fetch_deposit(debug: bool = False) -> dict:
+    """debug=True 일 때만 원본 응답(raw)과 시도 기록(trace)을 포함."""
     trial = await _try_many(DEPOSIT_CANDIDATES, _acct_payload())
     if not trial["ok"]:
-        return {"ok": False, "trace": trial["trace"], "status": trial["status"], "body": trial["body"]}
+        out = {"ok": False, "status": trial["status"], "body": trial["body"]}
+        if debug:
+            out["trace"] = trial["trace"]
+        return out
 
-    body = trial["body"]
-    deposit = _pick_first(body, ["예수금", "deposit", "DEPOSIT"], default=0)
-    orderable = _pick_first(body, ["주문가능금액", "orderable_cash", "ORD_PSB"], default=0)
-    return {
-        "ok": True,
-        "deposit": _to_int(deposit),
-        "orderable": _to_int(orderable),
-        "raw": body,
-        "endpoint": trial.get("endpoint"),
-        "trace": trial.get("trace", []),
-    }
+    rec = decode.DEPOSIT.decode(trial["body"], trial["endpoint"])
+    out = {"ok": True, **rec.as_dict(), "endpoint": trial["endpoint"]}
+    if debug:
+        out["raw"] = trial["body"]
+        out["trace"] = trial["trace"]
+    return out
 
 
-async def fetch_balance() -> dict:
+async def fetch_balance(debug: bool = False) -> dict:
+    """debug=True 일 때만 원본 응답(raw)과 시도 기록(trace)을 포함."""
     trial = await _try_many(BALANCE_CANDIDATES, _acct_payload())
     if not trial["ok"]:
-        return {"ok": False, "trace": trial["trace"], "status": trial["status"], "body": trial["body"]}
+        out = {"ok": False, "status": trial["status"], "body": trial["body"]}
+        if debug:
+            out["trace"] = trial["trace"]
+        return out
 
-    body = trial["body"]
-    total_purchase = _pick_first(body, ["총매입금액", "total_purchase"], default=0)
-    total_eval = _pick_first(body, ["총평가금액", "total_eval"], default=0)
-    total_pl = _pick_first(body, ["총평가손익금액", "total_pl"], default=0)
-    total_return = _pick_first(body, ["총수익률(%)", "total_return"], default=0.0)
-    today_realized = _pick_first(body, ["당일실현손익", "today_realized_pl"], default=0)
+    rec = decode.BALANCE.decode(trial["body"], trial["endpoint"])
+    out = {"ok": True, **rec.as_dict(), "endpoint": trial["endpoint"]}
+    if debug:
+        out["raw"] = trial["body"]
+        out["trace"] = trial["trace"]
+    return out
 
-    return {
-        "ok": True,
-        "total_purchase": _to_int(total_purchase),
-        "total_eval": _to_int(total_eval),
-        "total_pl": _to_int(total_pl),
-        "total_return": _to_float(total_return),
-        "today_realized": _to_int(today_realized),
-        "raw": body,
-        "endpoint": trial.get("endpoint"),
-        "trace": trial.get("trace", []),
-    }
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 시세 (관심종목정보 ka10095: stk_cd 를 "|" 로 이어 여러 종목을 한 번에)
+# ───────────────────────────────────────────────────────────────────────────────
+QUOTE_PATH = "/api/dostk/stkinfo"
+
+
+async def fetch_quotes(codes: list[str]) -> tuple[int, list[decode.QuoteRecord], dict]:
+    """(status, [QuoteRecord...], body) 반환. 응답에 없는 종목은 빠짐."""
+    status, body, _ = await _post_json(QUOTE_PATH, "ka10095", {"stk_cd": "|".join(codes)})
+    if status != 200 or not isinstance(body, dict):
+        return status, [], body
+    rows = body.get("atn_stk_infr") or []
+    return status, [decode.QUOTE.decode(r, "ka10095") for r in rows if r.get("stk_cd")], body
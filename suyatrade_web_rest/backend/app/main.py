@@ -1,15 +1,50 @@
 # backend/app/main.py
+import importlib
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from starlette.staticfiles import StaticFiles
 
 from .config import settings
+from . import upstream, auth, kiwoom, idempotency, metrics, breaker, decode, shared, warmup
+from .journal import journal
+from .notifier import notifier
+from .routes_positions import book
+from .scheduler import scheduler
+from .static_assets import PrecompressedStatic
+
+log = logging.getLogger("uvicorn.error")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 업스트림 커넥션 풀은 프로세스당 1개만 열어서 공유
+    await upstream.startup()
+    auth.start_renewer()
+    journal.start()
+    notifier.start()
+    book.start()
+    # 토큰/커넥션/엔드포인트 예열은 백그라운드로 (끝나면 /api/ready 가 200)
+    warmup.start()
+    try:
+        yield
+    finally:
+        await warmup.stop()
+        if "algo" in _loaded:
+            await importlib.import_module(".slicer", __package__).slicer.stop()
+        await book.stop()
+        await notifier.stop()
+        await journal.stop()
+        await auth.stop_renewer()
+        await upstream.shutdown()
 
 app = FastAPI(
     title="Suyatrade Web (Mock REST)",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=decode.FastJSONResponse,   # 응답 직렬화도 orjson
 )
 
 # CORS (개발 중 편하게 모두 허용)
@@ -21,10 +56,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 라우트 지연/진행 중 요청 수 + Server-Timing 헤더
+app.add_middleware(metrics.TimingMiddleware)
+
+# 서킷 open / 적응형 타임아웃 초과 → 대기 없이 명확한 상태코드로 실패
+@app.exception_handler(breaker.CircuitOpenError)
+async def _circuit_open(request: Request, exc: breaker.CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": {"error": "UPSTREAM_CIRCUIT_OPEN", "hint": str(exc)}},
+        headers={"Retry-After": str(max(1, int(exc.retry_in + 0.999)))},
+    )
+
+@app.exception_handler(breaker.UpstreamTimeout)
+async def _upstream_timeout(request: Request, exc: breaker.UpstreamTimeout):
+    return JSONResponse(status_code=504, content={"detail": {"error": "UPSTREAM_TIMEOUT", "hint": str(exc)}})
+
 # /web 정적 파일 마운트 (프로젝트 루트의 web 폴더)
 # app/app.py 기준으로 상위 상위가 프로젝트 루트
 WEB_DIR = (Path(__file__).resolve().parents[2] / "web")
-app.mount("/web", StaticFiles(directory=str(WEB_DIR), html=True), name="web")
+# 기본은 미리 압축 + 해시 이름/ETag 캐시 (STATIC_PRECOMPRESS=0 이면 기존 StaticFiles)
+if settings.STATIC_PRECOMPRESS:
+    web_static = PrecompressedStatic(WEB_DIR)
+    app.mount("/web", web_static, name="web")
+else:
+    web_static = None
+    app.mount("/web", StaticFiles(directory=str(WEB_DIR), html=True), name="web")
 
 @app.get("/", include_in_schema=False)
 async def _root():
@@ -40,14 +97,95 @@ app.include_router(misc_router)
 from .routes_account import router as account_router
 app.include_router(account_router)
 
-# (주문 라우트가 있다면 붙임: 없으면 무시)
-try:
-    from .routes_orders import router as orders_router
-    app.include_router(orders_router)
-except Exception:
-    pass
+# (로컬 포지션 장부 + 대사)
+from .routes_positions import router as positions_router
+app.include_router(positions_router)
+
+# 선택 라우터: ROUTERS_DISABLED 에 적힌 것은 import 도 안 함(slicer/pretrade/quotes 도 여기서만 로드).
+# orders 를 끄면 algo 도 끔(모주문도 같은 _place 로 주문). import 실패는 경고 로그 남기고 나머지는 계속.
+_OPTIONAL_ROUTERS = {
+    "stream": ".routes_stream",        # 계좌 요약 푸시(WebSocket/SSE)
+    "portfolio": ".routes_portfolio",  # 다계좌 포트폴리오 합산
+    "quotes": ".routes_quotes",        # 시세: 종목별 캐시 + 묶음 조회
+    "orders": ".routes_orders",        # 주문
+    "algo": ".routes_algo",            # 모주문 분할 실행(TWAP/아이스버그)
+}
+_disabled = {n.strip() for n in settings.ROUTERS_DISABLED.split(",") if n.strip()}
+if "orders" in _disabled:
+    _disabled.add("algo")
+_loaded: set[str] = set()
+for _name, _module in _OPTIONAL_ROUTERS.items():
+    if _name in _disabled:
+        continue
+    try:
+        app.include_router(importlib.import_module(_module, __package__).router)
+    except Exception:
+        log.warning("선택 라우터 %s(%s) 로드 실패 — 건너뜀", _name, _module, exc_info=True)
+        continue
+    _loaded.add(_name)
 
 # 헬스엔드포인트 (프론트 상단 '서버 상태' 버튼용)
 @app.get("/api/health")
 async def health():
     return {"status": "ok", "base_url": settings.base_url}
+
+# 준비 상태 (예열 끝나기 전엔 503 → 오케스트레이터 readiness probe 용)
+@app.get("/api/ready")
+async def ready():
+    st = warmup.status()
+    return JSONResponse(status_code=200 if st["ready"] else 503, content=st)
+
+# 업스트림 커넥션 풀 상태 (재사용률 확인용)
+@app.get("/api/upstream/pool")
+async def upstream_pool():
+    return upstream.pool_stats()
+
+# 후보 엔드포인트 학습 캐시 상태 (절약된 probe 수 등)
+@app.get("/api/upstream/endpoints")
+async def upstream_endpoints():
+    return kiwoom.endpoint_stats()
+
+# 업스트림 스케줄러 상태 (대기열 길이, 대기 시간, 429 횟수)
+@app.get("/api/upstream/scheduler")
+async def upstream_scheduler():
+    return scheduler.stats()
+
+# 주문 멱등성 저장소 상태 (재사용/중복 합류 횟수)
+@app.get("/api/orders/idempotency")
+async def orders_idempotency():
+    return idempotency.store.stats()
+
+# 텔레그램 알림 대기열/전송 상태
+@app.get("/api/notify/stats")
+async def notify_stats():
+    return notifier.stats()
+
+# 정적 파일 캐시 (압축 변형 크기, 해시 이름, 304 횟수)
+@app.get("/api/static/stats")
+async def static_stats():
+    return web_static.stats() if web_static is not None else {"precompress": False}
+
+# Prometheus 스크레이프용
+@app.get("/api/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# 응답 디코더 상태 (별칭 매핑 재해석 횟수)
+@app.get("/api/upstream/decoders")
+async def upstream_decoders():
+    return decode.stats()
+
+# 업스트림 녹화/재생 상태 (UPSTREAM_RECORD / UPSTREAM_REPLAY)
+@app.get("/api/upstream/recorder")
+async def upstream_recorder():
+    return upstream.recorder_stats()
+
+# 워커 간 공유 상태 (SHARED_STATE=sqlite 일 때 네임스페이스별 키 수)
+@app.get("/api/upstream/shared")
+async def upstream_shared():
+    return await shared.stats()
+
+# 서킷 브레이커 상태 (api_id/tr_id 별 state, 적응형 타임아웃, 헤징)
+@app.get("/api/upstream/breakers")
+async def upstream_breakers():
+    return breaker.stats()
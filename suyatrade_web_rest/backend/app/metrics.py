@@ -0,0 +1,187 @@
+# backend/app/metrics.py
+"""
+경량 Prometheus 메트릭 + Server-Timing.
+
+- 외부 의존성 없이 Counter/Gauge/Histogram 만 구현(text format 0.0.4)
+- TimingMiddleware: 라우트별 지연/진행 중 요청 수 기록,
+  응답 헤더 Server-Timing 에 auth / queue / upstream / app(로컬 처리) 분리
+"""
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Tuple
+
+# 초 단위(Prometheus 관례)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        out = self._header()
+        for labels, v in self._values.items():
+            out.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {v}")
+        return out
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [버킷별 개수..., sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, b in enumerate(self.buckets):
+            if value <= b:
+                s[i] += 1
+                break
+        s[-2] += value
+        s[-1] += 1
+
+    def render(self) -> list[str]:
+        out = self._header()
+        for labels, s in self._series.items():
+            acc = 0
+            for i, b in enumerate(self.buckets):
+                acc += s[i]
+                le = _fmt_labels(self.labelnames, labels, 'le="%s"' % b)
+                out.append(f"{self.name}_bucket{le} {acc}")
+            le = _fmt_labels(self.labelnames, labels, 'le="+Inf"')
+            out.append(f"{self.name}_bucket{le} {s[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {s[-2]}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {s[-1]}")
+        return out
+
+
+def render() -> str:
+    lines: list[str] = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 메트릭 정의
+# ───────────────────────────────────────────────────────────────────────────────
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "API 라우트별 처리 시간",
+                         ("method", "route", "status"))
+HTTP_INFLIGHT = Gauge("http_requests_in_flight", "처리 중인 API 요청 수")
+UPSTREAM_LATENCY = Histogram("upstream_request_duration_seconds", "브로커 호출 시간(api_id/tr_id 별)",
+                             ("api_id", "status"))
+UPSTREAM_QUEUE = Histogram("upstream_queue_wait_seconds", "스케줄러 대기 시간", ("api_id",))
+UPSTREAM_INFLIGHT = Gauge("upstream_requests_in_flight", "진행 중인 브로커 호출 수")
+TOKEN_REFRESH = Counter("token_refresh_total", "토큰 발급 시도", ("result",))
+TOKEN_REFRESH_LATENCY = Histogram("token_refresh_duration_seconds", "토큰 발급 소요 시간")
+ENDPOINT_PROBES = Counter("kiwoom_endpoint_probes_total", "_try_many 후보 호출 수",
+                          ("path", "api_id", "status"))
+PRETRADE_LATENCY = Histogram("pretrade_check_duration_seconds", "주문 전 로컬 검증 시간",
+                             buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005))
+PRETRADE_REJECTS = Counter("pretrade_rejects_total", "주문 전 검증 거절(사유별)", ("reason",))
+NOTIFY_EVENTS = Counter("notify_events_total", "알림 대기열에 들어온 이벤트 수")
+NOTIFY_DROPPED = Counter("notify_dropped_total", "대기열 초과로 버린 알림 이벤트 수")
+NOTIFY_QUEUE = Gauge("notify_queue_length", "알림 대기열 길이")
+NOTIFY_SENT = Counter("notify_send_total", "텔레그램 전송 결과", ("result",))
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Server-Timing (요청 단위 구간 누적)
+# ───────────────────────────────────────────────────────────────────────────────
+_timing: ContextVar[Dict[str, float] | None] = ContextVar("server_timing", default=None)
+
+
+def add_timing(phase: str, seconds: float) -> None:
+    t = _timing.get()
+    if t is not None:
+        t[phase] = t.get(phase, 0.0) + seconds
+
+
+def _server_timing(t: Dict[str, float], total: float) -> str:
+    local = max(0.0, total - sum(t.values()))
+    parts = [f"{k};dur={v * 1000:.1f}" for k, v in t.items()]
+    parts.append(f"app;dur={local * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """순수 ASGI 미들웨어(스트리밍 응답도 그대로 통과)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        t0 = time.perf_counter()
+        timing: Dict[str, float] = {}
+        token = _timing.set(timing)
+        status = {"code": 500}
+        HTTP_INFLIGHT.inc()
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing",
+                                _server_timing(timing, time.perf_counter() - t0).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_INFLIGHT.dec()
+            _timing.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_LATENCY.observe(time.perf_counter() - t0, scope["method"], route, str(status["code"]))
@@ -0,0 +1,174 @@
+# backend/app/notifier.py
+"""
+텔레그램 알림 (백그라운드 배치 전송).
+
+- publish(): 주문 경로에서 호출. 버퍼에 넣고 바로 반환(네트워크 대기 없음)
+- 버퍼 상한 NOTIFY_QUEUE_MAX: 넘치면 버리고 개수만 세어 다음 메시지에 "N건 생략" 으로 요약
+- sender: NOTIFY_DIGEST_MS 동안 모인 이벤트를 메시지 1개로 합쳐 전송(4096자 넘으면 나눔)
+- 전송 간격 NOTIFY_MIN_INTERVAL 이상(채팅당 초당 1건 권장), 429 는 retry_after 만큼 쉬고 재시도
+- 대상: data/telegram_settings.json (enabled/token/chat_id), 서버 주소 TELEGRAM_API_BASE
+  (테스트는 mock_kiwoom 의 /bot{token}/sendMessage 로 대체)
+- 업스트림 공유 클라이언트와 분리된 자체 클라이언트 사용(녹화/재생 transport 에 봇 토큰이 남지 않도록)
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from . import metrics
+from .config import settings
+from .storage import load_telegram_settings
+
+_MAX_TEXT = 4096
+
+
+class Notifier:
+    def __init__(self) -> None:
+        self._buf: List[str] = []
+        self._dropped = 0                       # 다음 메시지에 요약할 생략 건수
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._last_send = 0.0
+        self._http: httpx.AsyncClient | None = None
+        self._stats = {"published": 0, "dropped": 0, "sent": 0, "failed": 0, "events_sent": 0, "disabled": 0}
+
+    # ── 넣기 ────────────────────────────────────────────────────────────────
+    def publish(self, text: str) -> None:
+        if len(self._buf) >= settings.NOTIFY_QUEUE_MAX:
+            self._dropped += 1
+            self._stats["dropped"] += 1
+            metrics.NOTIFY_DROPPED.inc()
+            return
+        self._buf.append(f"{time.strftime('%H:%M:%S')} {text}")
+        self._stats["published"] += 1
+        metrics.NOTIFY_EVENTS.inc()
+        metrics.NOTIFY_QUEUE.set(len(self._buf))
+        if self._wake is not None:
+            self._wake.set()
+
+    def order_event(self, rec: Dict[str, Any]) -> None:
+        """주문 저널 레코드 → 한 줄 요약."""
+        side = "매수" if rec.get("side") == "buy" else "매도"
+        kind = "시장가" if rec.get("market") else f"{rec.get('price', 0):,}원"
+        head = f"[{side}] {rec.get('code')} {rec.get('qty')}주 {kind}"
+        if "rejected" in rec:
+            tail = "거절(사전검증): " + ", ".join(r["code"] for r in rec["rejected"])
+        elif "error" in rec:
+            tail = f"오류: {rec['error']}"
+        else:
+            body = rec.get("response") if isinstance(rec.get("response"), dict) else {}
+            ok = rec.get("status") == 200 and str(body.get("return_code", "0")) == "0"
+            tail = f"접수 {body.get('ord_no', '')}".rstrip() if ok else \
+                f"실패 {rec.get('status')} {body.get('return_msg', '')}".rstrip()
+        self.publish(f"{head} → {tail}")
+
+    # ── 보내기 ──────────────────────────────────────────────────────────────
+    def _digest(self, lines: List[str], dropped: int) -> List[str]:
+        if dropped:
+            lines = [*lines, f"… 외 {dropped}건 생략(알림 대기열 초과)"]
+        chunks: List[str] = []
+        cur = ""
+        for line in lines:
+            line = line[: _MAX_TEXT]
+            if cur and len(cur) + 1 + len(line) > _MAX_TEXT:
+                chunks.append(cur)
+                cur = ""
+            cur = f"{cur}\n{line}" if cur else line
+        if cur:
+            chunks.append(cur)
+        return chunks
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
+
+    async def _send(self, token: str, chat_id: str, text: str) -> bool:
+        url = f"{settings.TELEGRAM_API_BASE.rstrip('/')}/bot{token}/sendMessage"
+        for _ in range(3):
+            wait = self._last_send + settings.NOTIFY_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_send = time.monotonic()
+            try:
+                r = await self._client().post(url, json={"chat_id": chat_id, "text": text})
+            except Exception:
+                metrics.NOTIFY_SENT.inc("error")
+                await asyncio.sleep(1.0)
+                continue
+            if r.status_code == 429:
+                metrics.NOTIFY_SENT.inc("429")
+                try:
+                    retry = float(r.json().get("parameters", {}).get("retry_after", 1))
+                except Exception:
+                    retry = 1.0
+                await asyncio.sleep(retry)
+                continue
+            metrics.NOTIFY_SENT.inc("ok" if r.status_code == 200 else str(r.status_code))
+            return r.status_code == 200
+        return False
+
+    async def _flush(self) -> None:
+        lines, self._buf = self._buf, []
+        dropped, self._dropped = self._dropped, 0
+        metrics.NOTIFY_QUEUE.set(0)
+        if not lines and not dropped:
+            return
+        tg = await load_telegram_settings()
+        if not (tg.get("enabled") and tg.get("token") and tg.get("chat_id")):
+            self._stats["disabled"] += len(lines)
+            return
+        chunks = self._digest(lines, dropped)
+        for i, text in enumerate(chunks):
+            try:
+                ok = await self._send(tg["token"], tg["chat_id"], text)
+            except asyncio.CancelledError:
+                # 종료 중 취소: 못 보낸 묶음은 버퍼 앞으로 되돌려 stop() 의 마지막 flush 에서 전송
+                self._buf[:0] = chunks[i:]
+                raise
+            self._stats["sent" if ok else "failed"] += 1
+        self._stats["events_sent"] += len(lines)
+
+    async def _sender(self) -> None:
+        while True:
+            await self._wake.wait()
+            # 몰려오는 이벤트를 모으는 창
+            await asyncio.sleep(settings.NOTIFY_DIGEST_MS / 1000)
+            self._wake.clear()
+            try:
+                await self._flush()
+            except Exception:
+                self._stats["failed"] += 1
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            if self._buf:
+                self._wake.set()
+            self._task = asyncio.ensure_future(self._sender())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 남은 알림은 짧게만 시도(종료를 오래 붙잡지 않음)
+        try:
+            await asyncio.wait_for(self._flush(), 3.0)
+        except Exception:
+            pass
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "queued": len(self._buf), "pending_dropped": self._dropped}
+
+
+notifier = Notifier()
@@ -0,0 +1,105 @@
+# backend/app/pretrade.py
+"""
+주문 전 로컬 검증 (브로커 왕복 없이 거절).
+
+- 종목코드 형식, 지정가 가격 > 0
+- 호가단위(KRX 2023 통합 호가가격단위)
+- 가격제한폭: 전일종가 ± PRETRADE_PRICE_BAND (PRETRADE_QUOTE_MAX_AGE 이내 시세가 캐시에 있을 때만 —
+  지난 장 시세로 전일종가를 잘못 잡아 정상 주문을 거절하지 않도록)
+- 주문금액 상한 PRETRADE_MAX_AMOUNT (0 이면 끔)
+- 주문가능금액/보유수량: 로컬 포지션 장부가 한 번이라도 대사된 뒤에만
+* 업스트림 호출/await 없음 → 검증은 수 µs
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+from . import metrics
+from .config import settings
+from .routes_positions import book
+from .routes_quotes import quotes
+
+# (상한 미만, 호가단위)
+_TICKS = ((2_000, 1), (5_000, 5), (20_000, 10), (50_000, 50), (200_000, 100), (500_000, 500))
+
+_stats = {"checked": 0, "rejected": 0}
+
+
+class PreTradeRejected(Exception):
+    def __init__(self, reasons: List[Dict[str, Any]]):
+        super().__init__("; ".join(r["msg"] for r in reasons))
+        self.reasons = reasons
+
+
+def tick_size(price: int) -> int:
+    for bound, tick in _TICKS:
+        if price < bound:
+            return tick
+    return 1_000
+
+
+def _reject(reasons: list, code: str, msg: str, **extra) -> None:
+    reasons.append({"code": code, "msg": msg, **extra})
+
+
+def check(code: str, qty: int, is_buy: bool, is_market: bool, price: int) -> List[Dict[str, Any]]:
+    """위반 사유 목록 반환(빈 목록이면 통과)."""
+    reasons: List[Dict[str, Any]] = []
+    if len(code) != 6 or not code.isalnum():
+        _reject(reasons, "BAD_CODE", "종목코드는 6자리")
+    if qty <= 0:
+        _reject(reasons, "BAD_QTY", "수량은 1주 이상")
+
+    q = quotes.peek(code, settings.PRETRADE_QUOTE_MAX_AGE)
+    if not is_market:
+        if price <= 0:
+            _reject(reasons, "NO_PRICE", "지정가 주문은 가격 필요")
+        else:
+            tick = tick_size(price)
+            if price % tick:
+                _reject(reasons, "TICK_SIZE", f"호가단위 {tick}원 위반",
+                        tick=tick, lower=price - price % tick, upper=price - price % tick + tick)
+            if q is not None and q.price:
+                prev = q.price - q.change
+                lo = int(prev * (1 - settings.PRETRADE_PRICE_BAND))
+                hi = int(prev * (1 + settings.PRETRADE_PRICE_BAND))
+                if not lo <= price <= hi:
+                    _reject(reasons, "PRICE_BAND", f"가격제한폭 {lo}~{hi}원 벗어남", lower=lo, upper=hi)
+
+    # 금액: 지정가는 주문가, 시장가는 캐시된 현재가로 추정(없으면 금액 검사 생략)
+    est = price if not is_market else (q.price if q is not None else 0)
+    amount = est * qty
+    if amount and settings.PRETRADE_MAX_AMOUNT and amount > settings.PRETRADE_MAX_AMOUNT:
+        _reject(reasons, "MAX_AMOUNT", f"주문금액 상한 {settings.PRETRADE_MAX_AMOUNT}원 초과", amount=amount)
+
+    if book.reconciled_at:
+        if is_buy:
+            orderable = book.cash["orderable"]
+            if amount and amount > orderable:
+                _reject(reasons, "INSUFFICIENT_CASH", "주문가능금액 부족", amount=amount, orderable=orderable)
+        else:
+            p = book.positions.get(code)
+            sellable = (p.qty - p.pending_sell) if p else 0
+            if qty > sellable:
+                _reject(reasons, "INSUFFICIENT_QTY", "매도가능수량 부족", sellable=sellable)
+    return reasons
+
+
+def validate(code: str, qty: int, is_buy: bool, is_market: bool, price: int) -> None:
+    """위반이 있으면 PreTradeRejected. 소요 시간/거절 사유를 메트릭에 기록."""
+    if not settings.PRETRADE_ENABLED:
+        return
+    t0 = time.perf_counter()
+    reasons = check(code, qty, is_buy, is_market, price)
+    metrics.PRETRADE_LATENCY.observe(time.perf_counter() - t0)
+    _stats["checked"] += 1
+    if reasons:
+        _stats["rejected"] += 1
+        for r in reasons:
+            metrics.PRETRADE_REJECTS.inc(r["code"])
+        raise PreTradeRejected(reasons)
+
+
+def stats() -> Dict[str, Any]:
+    return {**_stats, "book_reconciled": bool(book.reconciled_at)}
@@ -0,0 +1,215 @@
+# backend/app/recorder.py
+"""
+업스트림 트래픽 녹화/재생 (httpx transport 교체).
+
+- UPSTREAM_RECORD=경로: 실제 전송은 그대로, 요청/응답/소요시간을 한 줄씩 기록
+    {"t": 녹화 시작 후 초, "ms": 왕복 ms, "m": 메서드, "u": 경로?쿼리, "api": api-id|tr_id,
+     "q": 요청 본문, "s": 상태, "h": 응답 헤더, "b": 응답 본문(utf-8 아니면 "b64")}
+  경로가 .gz 로 끝나면 gzip 으로 압축해서 씀
+- UPSTREAM_REPLAY=경로: 네트워크 없이 녹화본으로 응답
+    * 같은 (메서드, 경로, api, 본문) 요청에는 녹화된 순서대로 응답(끝나면 처음부터 반복) → 결정적
+    * 본문까지 같은 게 없으면 (메서드, 경로, api) 만으로 찾음, 그래도 없으면 ConnectError
+    * REPLAY_SPEED=1 원래 속도(녹화된 ms 만큼 대기), 2 는 두 배 빠르게, 0 은 대기 없이
+- 요청 헤더(토큰/앱키)는 기록하지 않음. 본문의 appkey/appsecret/secretkey/발급 토큰 값과
+  /bot{token}/ 경로는 "***" 로 가려서 기록(재생 때도 같은 규칙으로 가려서 매칭)
+  응답은 압축을 푼 본문으로 기록(content-encoding 제거) → gzip/br 응답도 같은 규칙으로 가려짐.
+  utf-8 이 아니라 가릴 수 없는 본문에 비밀 키 이름이 보이면 본문 자체를 기록하지 않음
+
+  python -m app.recorder summary data/capture.ndjson.gz   # api 별 건수/지연 요약
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from . import decode
+
+# 다시 만들 때 httpx 가 채우는 헤더(본문은 이미 다 읽었으므로) + 기록하면 안 되는 헤더
+_DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive",
+                 "set-cookie"}
+
+# 녹화 파일에 남기면 안 되는 본문 키(토큰 발급 요청/응답)
+_SECRET_KEYS = {"appkey", "appsecret", "secretkey", "token", "access_token", "approval_key"}
+_MASK = "***"
+_BOT_PATH = re.compile(r"/bot[^/]+/")
+
+_Key = Tuple[str, str, str, str]
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _api(headers) -> str:
+    return headers.get("api-id") or headers.get("tr_id") or ""
+
+
+def _target(url: httpx.URL) -> str:
+    return _BOT_PATH.sub(f"/bot{_MASK}/", url.raw_path.decode("ascii"))
+
+
+def _redact(text: str) -> str:
+    """JSON 객체면 비밀 키 값만 가림(그 외 본문은 그대로)."""
+    if not any(k in text for k in _SECRET_KEYS):
+        return text
+    try:
+        body = decode.loads(text)
+    except ValueError:
+        return text
+    if not isinstance(body, dict) or not _SECRET_KEYS.intersection(body):
+        return text
+    return decode.dumps({k: (_MASK if k in _SECRET_KEYS else v) for k, v in body.items()})
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 녹화
+# ───────────────────────────────────────────────────────────────────────────────
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.inner = inner
+        self.path = path
+        self._fh = None
+        self._t0: float | None = None
+        self._stats = {"recorded": 0, "bytes": 0}
+
+    def _write(self, rec: Dict[str, Any]) -> None:
+        if self._fh is None:
+            self._fh = _open(self.path, "a")
+        line = decode.dumps(rec)
+        self._fh.write(line + "\n")
+        self._stats["recorded"] += 1
+        self._stats["bytes"] += len(line) + 1
+        if self._stats["recorded"] % 256 == 0:
+            self._fh.flush()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.monotonic()
+        if self._t0 is None:
+            self._t0 = t0
+        body = await request.aread()
+        resp = await self.inner.handle_async_request(request)
+        try:
+            # 압축 해제된 본문(가리기 전에 gzip/br 을 풀어야 함)
+            raw = b"".join([chunk async for chunk in resp.aiter_bytes()])
+        finally:
+            await resp.aclose()
+        ms = (time.monotonic() - t0) * 1000
+
+        headers = [(k, v) for k, v in resp.headers.multi_items() if k.lower() not in _DROP_HEADERS]
+        rec: Dict[str, Any] = {
+            "t": round(t0 - self._t0, 4), "ms": round(ms, 2),
+            "m": request.method, "u": _target(request.url), "api": _api(request.headers),
+            "q": _redact(body.decode("utf-8", "replace")), "s": resp.status_code, "h": headers,
+        }
+        try:
+            rec["b"] = _redact(raw.decode("utf-8"))
+        except UnicodeDecodeError:
+            if any(k.encode() in raw for k in _SECRET_KEYS):
+                rec["b"] = _MASK
+            else:
+                rec["b64"] = base64.b64encode(raw).decode("ascii")
+        self._write(rec)
+        return httpx.Response(resp.status_code, headers=headers, content=raw,
+                              extensions={"http_version": resp.extensions.get("http_version", b"HTTP/1.1")})
+
+    async def aclose(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        await self.inner.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "record", "path": str(self.path), **self._stats}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 재생
+# ───────────────────────────────────────────────────────────────────────────────
+def load(path: Path) -> List[Dict[str, Any]]:
+    with _open(path, "r") as fh:
+        return [decode.loads(line) for line in fh if line.strip()]
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, path: Path, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self._exact: Dict[_Key, List[Dict[str, Any]]] = {}
+        self._loose: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._cursor: Dict[Any, int] = {}
+        self._stats = {"loaded": 0, "exact": 0, "loose": 0, "misses": 0}
+        for rec in load(path):
+            self._exact.setdefault((rec["m"], rec["u"], rec["api"], rec["q"]), []).append(rec)
+            self._loose.setdefault((rec["m"], rec["u"], rec["api"]), []).append(rec)
+            self._stats["loaded"] += 1
+
+    def _next(self, table: Dict[Any, List[Dict[str, Any]]], key: Any) -> Dict[str, Any] | None:
+        recs = table.get(key)
+        if not recs:
+            return None
+        i = self._cursor.get((id(table), key), 0)
+        self._cursor[(id(table), key)] = i + 1
+        return recs[i % len(recs)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = _redact((await request.aread()).decode("utf-8", "replace"))
+        loose = (request.method, _target(request.url), _api(request.headers))
+        rec = self._next(self._exact, (*loose, body))
+        if rec is not None:
+            self._stats["exact"] += 1
+        else:
+            rec = self._next(self._loose, loose)
+            if rec is None:
+                self._stats["misses"] += 1
+                raise httpx.ConnectError(f"replay: 녹화 없음 {loose}", request=request)
+            self._stats["loose"] += 1
+
+        if self.speed > 0:
+            await asyncio.sleep(rec["ms"] / 1000 / self.speed)
+        content = base64.b64decode(rec["b64"]) if "b64" in rec else rec["b"].encode("utf-8")
+        return httpx.Response(rec["s"], headers=rec["h"], content=content,
+                              extensions={"http_version": b"HTTP/1.1"})
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "replay", "path": str(self.path), "speed": self.speed, **self._stats}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 녹화본 요약 (빌드 간 비교용)
+# ───────────────────────────────────────────────────────────────────────────────
+def summarize(recs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    by_api: Dict[str, List[Dict[str, Any]]] = {}
+    for rec in recs:
+        by_api.setdefault(rec["api"] or rec["u"], []).append(rec)
+    out: Dict[str, Dict[str, Any]] = {}
+    for api, rows in sorted(by_api.items()):
+        ms = sorted(r["ms"] for r in rows)
+        out[api] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if r["s"] >= 400),
+            "p50_ms": ms[len(ms) // 2],
+            "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+            "max_ms": ms[-1],
+        }
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "summary":
+        sys.exit("usage: python -m app.recorder summary <capture.ndjson[.gz]>")
+    recs = load(Path(sys.argv[2]))
+    span = recs[-1]["t"] - recs[0]["t"] if recs else 0.0
+    print(f"{len(recs)} requests over {span:.1f}s")
+    for api, row in summarize(recs).items():
+        print(f"{api:>14}: " + " ".join(f"{k}={v}" for k, v in row.items()))
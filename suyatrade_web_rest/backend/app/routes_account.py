@@ -1,33 +1,21 @@
 # backend/app/routes_account.py
-from typing import Any, Dict
-import httpx
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
+from . import decode, shared
 from .config import settings
 from .auth import get_token
+from .kiwoom import fetch_balance, fetch_deposit
+from .scheduler import QUERY, scheduler
+from .upstream import get_client
 
 router = APIRouter(prefix="/api/account", tags=["account"])
 
 BASE = settings.base_url.rstrip("/")  # ex) https://mockapi.kiwoom.com
 
-def _to_int(x: Any, default: int = 0) -> int:
-    try:
-        if x is None:
-            return default
-        if isinstance(x, (int, float)):
-            return int(x)
-        return int(str(x).replace(",", "").strip())
-    except Exception:
-        return default
-
-def _to_float(x: Any, default: float = 0.0) -> float:
-    try:
-        if x is None:
-            return default
-        return float(str(x).replace("%", "").strip())
-    except Exception:
-        return default
-
 async def _auth_headers(token: str, tr_id: str) -> Dict[str, str]:
     return {
         "content-type": "application/json; charset=utf-8",
@@ -38,8 +26,200 @@ async def _auth_headers(token: str, tr_id: str) -> Dict[str, str]:
         "custtype": "P",
     }
 
+class UpstreamStatusError(Exception):
+    """200 이 아니거나 rt_cd 가 "0" 이 아닌 응답(본문을 값으로 쓰면 0 으로 둔갑함)."""
+
+def _checked_json(r, what: str) -> Dict[str, Any]:
+    body = decode.response_json(r)
+    msg = str(body.get("msg1") or body.get("return_msg") or "").strip()
+    if r.status_code != 200:
+        raise UpstreamStatusError(f"{what} HTTP {r.status_code} {msg}".rstrip())
+    if str(body.get("rt_cd", "0")) != "0":
+        raise UpstreamStatusError(f"{what} rt_cd={body.get('rt_cd')} {msg}".rstrip())
+    return body
+
+async def _balance_leg(client, token: str, cano: str, prdt: str) -> Dict[str, Any]:
+    """1) 잔고/평가 (inquire-balance)"""
+    url_bal = f"{BASE}/uapi/domestic-stock/v1/trading/inquire-balance"
+    hdr = await _auth_headers(token, tr_id="VTTC8434R")  # 모의 조회용 예시
+    params_bal = {
+        "CANO": cano,
+        "ACNT_PRDT_CD": prdt,
+        "AFHR_FLPR_YN": "N",
+        "OFL_YN": "N",
+        "INQR_DVSN_1": "",
+        "INQR_DVSN_2": "",
+        "CTX_AREA_FK100": "",
+        "CTX_AREA_NK100": "",
+    }
+    rb = await scheduler.run(
+        "VTTC8434R", QUERY, lambda: client.get(url_bal, headers=hdr, params=params_bal), hedge=True
+    )
+    jb = _checked_json(rb, "VTTC8434R")
+    out1 = (jb.get("output1") or [{}])[0]
+
+    res: Dict[str, Any] = decode.KIS_BALANCE.decode(out1, "VTTC8434R").as_dict()
+    cash = decode.KIS_BALANCE_CASH.decode(out1, "VTTC8434R")
+    if cash.deposit:
+        res["deposit"] = cash.deposit
+    if cash.orderable:
+        res["orderable"] = cash.orderable
+    return res
+
+async def _deposit_leg(client, token: str, cano: str, prdt: str) -> Dict[str, Any]:
+    """2) 예수금/주문가능 (inquire-psbl-deposit). 있는 키만 반환(마지막 키 우선)."""
+    url_dep = f"{BASE}/uapi/domestic-stock/v1/trading/inquire-psbl-deposit"
+    hdr = await _auth_headers(token, tr_id="VTTC8976R")  # 모의 조회용 예시
+    params_dep = {"CANO": cano, "ACNT_PRDT_CD": prdt}
+    rd = await scheduler.run(
+        "VTTC8976R", QUERY, lambda: client.get(url_dep, headers=hdr, params=params_dep), hedge=True
+    )
+    jd = _checked_json(rd, "VTTC8976R")
+    out = (jd.get("output") or [{}])[0]
+
+    rec = decode.KIS_DEPOSIT.decode(out, "VTTC8976R")
+    return {k: v for k, v in rec.as_dict().items() if v is not None}
+
+async def _fetch_summary(cano: str | None = None, prdt: str | None = None) -> Dict[str, Any]:
+    """계좌 1개 요약(미지정 시 기본 계좌). 토큰/커넥션 풀은 모든 계좌가 공유."""
+    token = await get_token()
+    cano = cano or settings.ACCOUNT_NO
+    prdt = prdt or settings.ACNT_PRDT_CD
+    client = get_client()
+
+    summary: Dict[str, Any] = {
+        "deposit": 0,
+        "orderable": 0,
+        "today_realized": 0,
+        "total_purchase": 0,
+        "total_eval": 0,
+        "total_pl": 0,
+        "total_return": 0.0,
+    }
+    errors = []
+
+    # 두 조회는 서로 독립 → 동시에 (지연 = 합이 아니라 max)
+    bal, dep = await asyncio.gather(
+        _balance_leg(client, token, cano, prdt),
+        _deposit_leg(client, token, cano, prdt),
+        return_exceptions=True,
+    )
+    # 예수금/주문가능은 psbl-deposit 값이 잔고 응답 값보다 우선
+    for name, part in (("balance", bal), ("deposit", dep)):
+        if isinstance(part, BaseException):
+            errors.append(f"{name}:{type(part).__name__}:{part}")
+        else:
+            summary.update(part)
+
+    return {"ok": True, "errors": errors, **summary}
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 종목별 보유 (inquire-balance output1 중 pdno 가 있는 행)
+# ───────────────────────────────────────────────────────────────────────────────
+async def iter_holdings() -> AsyncIterator[decode.HoldingRecord]:
+    """
+    연속조회 키(CTX_AREA_FK100/NK100)를 따라가며 한 페이지씩 받아 종목별로 yield.
+    응답 헤더 tr_cont 가 F/M 이면 다음 페이지 있음(요청 헤더 tr_cont=N 으로 이어 받기).
+    200 이 아닌 페이지는 UpstreamStatusError(빈 페이지/마지막 페이지와 구분되도록).
+    """
+    token = await get_token()
+    client = get_client()
+    url_bal = f"{BASE}/uapi/domestic-stock/v1/trading/inquire-balance"
+    fk, nk = "", ""
+    for page in range(settings.HOLDINGS_MAX_PAGES):
+        hdr = await _auth_headers(token, tr_id="VTTC8434R")
+        if page:
+            hdr["tr_cont"] = "N"
+        params_bal = {
+            "CANO": settings.ACCOUNT_NO,
+            "ACNT_PRDT_CD": settings.ACNT_PRDT_CD,
+            "AFHR_FLPR_YN": "N",
+            "OFL_YN": "N",
+            "INQR_DVSN_1": "",
+            "INQR_DVSN_2": "",
+            "CTX_AREA_FK100": fk,
+            "CTX_AREA_NK100": nk,
+        }
+        rb = await scheduler.run(
+            "VTTC8434R", QUERY,
+            lambda h=hdr, p=params_bal: client.get(url_bal, headers=h, params=p), hedge=True,
+        )
+        jb = _checked_json(rb, f"VTTC8434R page {page + 1}")
+        for r in jb.get("output1") or []:
+            if r.get("pdno"):
+                yield decode.KIS_HOLDING.decode(r, "VTTC8434R")
+
+        nfk = str(jb.get("ctx_area_fk100") or "").strip()
+        nnk = str(jb.get("ctx_area_nk100") or "").strip()
+        # 마지막 페이지이거나 키가 그대로면(무한 반복 방지) 종료
+        if rb.headers.get("tr_cont", "") not in ("F", "M") or not nnk or (nfk, nnk) == (fk, nk):
+            return
+        fk, nk = nfk, nnk
+
+async def fetch_holdings() -> list:
+    return [h async for h in iter_holdings()]
+
+@router.get("/holdings")
+async def get_account_holdings():
+    """
+    종목별 보유 NDJSON 스트림(한 줄 = 한 종목). 페이지가 도착하는 대로 전송.
+    중간 실패 시 {"error": ...} 한 줄을 보내고 종료.
+    """
+    async def _ndjson():
+        try:
+            async for h in iter_holdings():
+                yield decode.dumps(h.as_dict()) + "\n"
+        except Exception as e:
+            yield decode.dumps({"error": f"{type(e).__name__}:{e}"}) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 요약 캐시
+#   - SUMMARY_TTL 이내: 캐시 그대로
+#   - SUMMARY_STALE 이내: 캐시 응답 + 백그라운드 갱신(stale-while-revalidate)
+#   - 그 외/refresh=1: 갱신 완료까지 대기
+#   * 동시에 들어온 요청은 진행 중인 갱신 1건을 공유
+# ───────────────────────────────────────────────────────────────────────────────
+_summary_cache: Dict[str, Any] = {"data": None, "at": 0.0}
+_summary_task: "asyncio.Task | None" = None
+
+async def _refresh_summary() -> Dict[str, Any]:
+    data = await _fetch_summary()
+    at = time.time()
+    if not data["errors"]:
+        # 일부 실패한 결과는 캐시하지 않음(다음 요청이 다시 시도)
+        _summary_cache["data"] = data
+        _summary_cache["at"] = at
+        await shared.put("summary", _summary_key(), {"data": data, "at": at}, ttl=settings.SUMMARY_STALE)
+    return {"data": data, "at": at}
+
+def _summary_key() -> str:
+    return f"{settings.ACCOUNT_NO}-{settings.ACNT_PRDT_CD}"
+
+async def _adopt_shared_summary() -> None:
+    """로컬 캐시가 신선하지 않을 때만: 다른 워커가 더 최근에 받아 둔 요약이 있으면 사용."""
+    hit = await shared.get("summary", _summary_key())
+    if hit and hit["at"] > _summary_cache["at"]:
+        _summary_cache["data"] = hit["data"]
+        _summary_cache["at"] = hit["at"]
+
+def _summary_refresh_shared() -> "asyncio.Task":
+    global _summary_task
+    if _summary_task is None or _summary_task.done():
+        _summary_task = asyncio.ensure_future(_refresh_summary())
+    return _summary_task
+
+def _with_age(data: Dict[str, Any], at: float, stale: bool) -> Dict[str, Any]:
+    return {
+        **data,
+        "as_of": at,
+        "age_ms": int(max(0.0, time.time() - at) * 1000),
+        "stale": stale,
+    }
+
 @router.get("/summary")
-async def get_account_summary():
+async def get_account_summary(refresh: bool = False):
     """
     통합 계좌 요약:
       - deposit(총 예수금)
@@ -49,89 +229,31 @@ async def get_account_summary():
       - total_eval(총 평가금액)
       - total_pl(총 평가손익)
       - total_return(총 수익률)
+    as_of/age_ms/stale 로 데이터 나이를 함께 알려줌.
     """
-    token = await get_token()
-    cano = settings.ACCOUNT_NO
-    prdt = settings.ACNT_PRDT_CD
-
-    deposit = 0
-    orderable = 0
-    today_realized = 0
-    total_purchase = 0
-    total_eval = 0
-    total_pl = 0
-    total_return = 0.0
-    errors = []
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        # 1) 잔고/평가
-        try:
-            url_bal = f"{BASE}/uapi/domestic-stock/v1/trading/inquire-balance"
-            hdr = await _auth_headers(token, tr_id="VTTC8434R")  # 모의 조회용 예시
-            params_bal = {
-                "CANO": cano,
-                "ACNT_PRDT_CD": prdt,
-                "AFHR_FLPR_YN": "N",
-                "OFL_YN": "N",
-                "INQR_DVSN_1": "",
-                "INQR_DVSN_2": "",
-                "CTX_AREA_FK100": "",
-                "CTX_AREA_NK100": "",
-            }
-            rb = await client.get(url_bal, headers=hdr, params=params_bal)
-            jb = rb.json() if rb.headers.get("content-type", "").startswith("application/json") else {}
-            out1 = (jb.get("output1") or [{}])[0]
-
-            total_purchase = _to_int(out1.get("pchs_amt_smtby", total_purchase))
-            total_eval     = _to_int(out1.get("tot_evlu_amt", total_eval))
-            total_pl       = _to_int(out1.get("evlu_pfls_smtby", total_pl))
-            total_return   = _to_float(out1.get("evlu_erng_rt", total_return))
-
-            deposit_tmp   = _to_int(out1.get("dnca_tot_amt", 0))
-            order_tmp     = _to_int(out1.get("ord_psbl_cash", 0))
-            if deposit_tmp:
-                deposit = deposit_tmp
-            if order_tmp:
-                orderable = order_tmp
-
-            for k in ("prdy_cprs_pl", "thdt_pnl_amt", "tdts_unstt_amt"):
-                v = _to_int(out1.get(k, 0))
-                if v:
-                    today_realized = v
-                    break
+    if not refresh and shared.enabled and time.time() - _summary_cache["at"] >= settings.SUMMARY_TTL:
+        await _adopt_shared_summary()
+    data, at = _summary_cache["data"], _summary_cache["at"]
+    age = time.time() - at
+    if data is not None and not refresh:
+        if age < settings.SUMMARY_TTL:
+            return _with_age(data, at, stale=False)
+        if age < settings.SUMMARY_STALE:
+            _summary_refresh_shared()
+            return _with_age(data, at, stale=True)
 
-        except Exception as e:
-            errors.append(f"balance:{type(e).__name__}:{e}")
-
-        # 2) 예수금/주문가능
-        try:
-            url_dep = f"{BASE}/uapi/domestic-stock/v1/trading/inquire-psbl-deposit"
-            hdr = await _auth_headers(token, tr_id="VTTC8976R")  # 모의 조회용 예시
-            params_dep = {"CANO": cano, "ACNT_PRDT_CD": prdt}
-            rd = await client.get(url_dep, headers=hdr, params=params_dep)
-            jd = rd.json() if rd.headers.get("content-type", "").startswith("application/json") else {}
-            out = (jd.get("output") or [{}])[0]
+    res = await asyncio.shield(_summary_refresh_shared())
+    return _with_age(res["data"], res["at"], stale=False)
 
-            for k in ("dnca_tot_amt", "dnca_tot_amt_won", "dnca_tot", "deposit"):
-                deposit = _to_int(out.get(k, deposit))
+@router.get("/deposit")
+async def get_account_deposit(debug: bool = False):
+    """예수금/주문가능(kt00001 후보 중 학습된 엔드포인트). debug=1 이면 원본 응답(raw)/시도 기록(trace) 포함."""
+    return await fetch_deposit(debug=debug)
 
-            for k in ("ord_psbl_cash", "ord_psbl_amt", "orderable_cash", "orderable"):
-                orderable = _to_int(out.get(k, orderable))
-
-        except Exception as e:
-            errors.append(f"deposit:{type(e).__name__}:{e}")
-
-    return {
-        "ok": True,
-        "errors": errors,
-        "deposit": deposit,
-        "orderable": orderable,
-        "today_realized": today_realized,
-        "total_purchase": total_purchase,
-        "total_eval": total_eval,
-        "total_pl": total_pl,
-        "total_return": total_return,
-    }
+@router.get("/balance")
+async def get_account_balance(debug: bool = False):
+    """잔고 합계(kt00017 후보 중 학습된 엔드포인트). debug=1 이면 원본 응답(raw)/시도 기록(trace) 포함."""
+    return await fetch_balance(debug=debug)
 
 @router.get("/summary/debug")
 async def get_account_summary_debug():
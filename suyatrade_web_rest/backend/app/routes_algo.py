@@ -0,0 +1,99 @@
+# backend/app/routes_algo.py
+"""
+모주문 분할 실행 API (/api/algo/orders).
+
+- POST   /api/algo/orders          모주문 등록(twap | iceberg) → 첫 자식은 바로 전송
+- GET    /api/algo/orders          목록(?status=active|done|cancelled|failed)
+- GET    /api/algo/orders/{id}     상세(최근 자식 주문 포함)
+- DELETE /api/algo/orders/{id}     취소(남은 자식 전송 중단)
+- GET    /api/algo/stats           타이머 휠/대기열 상태
+"""
+from __future__ import annotations
+
+import math
+import uuid
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import Field
+
+from .config import settings
+from .routes_orders import OrderReq
+from .slicer import ACTIVE, Parent, slicer
+
+router = APIRouter(prefix="/api/algo", tags=["algo"])
+
+
+class AlgoOrderReq(OrderReq):
+    side: Literal["buy", "sell"] = Field(..., description="buy=매수, sell=매도")
+    policy: Literal["twap", "iceberg"] = Field(..., description="twap=시간분할, iceberg=노출수량 분할")
+    duration: float | None = Field(None, gt=0, description="twap: 전체 실행 시간(초)")
+    interval: float | None = Field(None, gt=0, description="자식 간격(초, 기본: twap=SLICE_DEFAULT_INTERVAL, iceberg=SLICE_MIN_INTERVAL)")
+    display_qty: int | None = Field(None, gt=0, description="iceberg: 자식 1건 수량")
+
+
+def _bad(hint: str) -> HTTPException:
+    return HTTPException(status_code=400, detail={"error": "BAD_ALGO_ORDER", "hint": hint})
+
+
+def _not_found(pid: str) -> HTTPException:
+    return HTTPException(status_code=404, detail={"error": "ALGO_ORDER_NOT_FOUND", "hint": pid})
+
+
+@router.post("/orders")
+async def create_algo_order(req: AlgoOrderReq):
+    if not req.market and not req.price:
+        raise _bad("지정가 모주문은 price 필요")
+    if slicer.active >= settings.SLICE_MAX_ACTIVE:
+        raise HTTPException(status_code=429, detail={
+            "error": "ALGO_TOO_MANY_ACTIVE",
+            "hint": f"진행 중 모주문은 최대 {settings.SLICE_MAX_ACTIVE}건",
+        })
+
+    duration, slices, display_qty = 0.0, 1, 0
+    if req.policy == "twap":
+        if req.duration is None:
+            raise _bad("twap 은 duration(초) 필요")
+        interval = max(settings.SLICE_MIN_INTERVAL, req.interval or settings.SLICE_DEFAULT_INTERVAL)
+        duration = req.duration
+        slices = max(1, min(req.qty, math.ceil(duration / interval)))
+    else:
+        if req.display_qty is None:
+            raise _bad("iceberg 는 display_qty 필요")
+        interval = max(settings.SLICE_MIN_INTERVAL, req.interval or settings.SLICE_MIN_INTERVAL)
+        display_qty = min(req.display_qty, req.qty)
+
+    p = Parent(uuid.uuid4().hex[:12], req.side, req.code, req.qty, req.market, req.price or 0,
+               req.policy, interval, duration, slices, display_qty)
+    return slicer.submit(p).as_dict()
+
+
+@router.get("/orders")
+async def list_algo_orders(
+    status: Literal["active", "done", "cancelled", "failed"] | None = Query(None),
+):
+    rows = [p.as_dict() for p in slicer.parents(status)]
+    return {"count": len(rows), "active": slicer.active, "orders": rows}
+
+
+@router.get("/orders/{pid}")
+async def get_algo_order(pid: str):
+    p = slicer.get(pid)
+    if p is None:
+        raise _not_found(pid)
+    return p.as_dict(children=True)
+
+
+@router.delete("/orders/{pid}")
+async def cancel_algo_order(pid: str):
+    p = slicer.get(pid)
+    if p is None:
+        raise _not_found(pid)
+    if p.status != ACTIVE:
+        raise HTTPException(status_code=409, detail={"error": "ALGO_ORDER_FINISHED", "hint": p.status})
+    return slicer.cancel(pid).as_dict()
+
+
+@router.get("/stats")
+async def algo_stats():
+    return slicer.stats()
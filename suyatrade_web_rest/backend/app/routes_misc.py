@@ -20,13 +20,13 @@ async def api_health():
 # --------------------------
 @router.get("/settings/general")
 async def get_general_settings():
-    data = load_settings()
+    data = await load_settings()
     return {"status_code": 200, "response": data, "headers": {}}
 
 @router.put("/settings/general")
 async def put_general_settings(payload: dict):
     try:
-        save_settings(payload)
+        await save_settings(payload)
         return {"status_code": 200, "response": {"ok": True}, "headers": {}}
     except Exception as e:
         raise HTTPException(status_code=500, detail={"error": "SETTINGS_SAVE_FAILED", "hint": str(e)})
@@ -36,13 +36,13 @@ async def put_general_settings(payload: dict):
 # --------------------------
 @router.get("/settings/telegram")
 async def get_telegram_settings():
-    data = load_telegram_settings()
+    data = await load_telegram_settings()
     return {"status_code": 200, "response": data, "headers": {}}
 
 @router.put("/settings/telegram")
 async def put_telegram_settings(payload: dict):
     try:
-        save_telegram_settings(payload)
+        await save_telegram_settings(payload)
         return {"status_code": 200, "response": {"ok": True}, "headers": {}}
     except Exception as e:
         raise HTTPException(status_code=500, detail={"error": "TELEGRAM_SAVE_FAILED", "hint": str(e)})
@@ -1,9 +1,21 @@
 # backend/app/routes_orders.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Header
+import asyncio
+import time
+from typing import Literal
+
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from . import breaker, decode, idempotency, pretrade
+from .config import settings
+from .journal import journal
 from .kiwoom import order_cash
+from .notifier import notifier
+from .routes_positions import book
+from .routes_quotes import quotes
 
 router = APIRouter()
 
@@ -15,17 +27,190 @@ class OrderReq(BaseModel):
     price: int | None = Field(0, description="지정가일 때만 사용")
 
 
+# 요청은 나갔는데 응답을 못 받은 경우(브로커에 접수됐을 수 있음)
+_SENT_TIMEOUTS = (breaker.UpstreamTimeout, httpx.ReadTimeout, httpx.WriteTimeout)
+_UNKNOWN = {
+    "error": "ORDER_OUTCOME_UNKNOWN",
+    "hint": "전송 후 응답이 없었습니다. 접수됐을 수 있으니 주문 내역/잔고를 확인하세요(같은 키 재요청은 재전송하지 않음).",
+}
+
+
+def _journal(rec: dict, **result) -> None:
+    """주문 결과 기록: 저널 + 알림(둘 다 버퍼에 넣기만 함)."""
+    rec.update(result)
+    rec["done_ts"] = time.time()
+    if settings.JOURNAL_ENABLED:
+        journal.append(rec)
+    notifier.order_event(rec)
+
+
+async def _place(req: OrderReq, is_buy: bool, idempotency_key: str | None):
+    """
+    order_cash 호출. 멱등 키가 있으면 서버측 저장소를 거침
+    (재요청은 저장된 응답, 처리 중 중복은 원래 요청 결과를 공유).
+    (status, body, headers, replayed) 반환.
+    """
+    async def call():
+        rec = {
+            "ts": time.time(),
+            "side": "buy" if is_buy else "sell",
+            "code": req.code,
+            "qty": req.qty,
+            "market": req.market,
+            "price": req.price or 0,
+            "idem": idempotency_key,
+        }
+        try:
+            pretrade.validate(req.code, req.qty, is_buy, req.market, req.price or 0)
+        except pretrade.PreTradeRejected as e:
+            _journal(rec, rejected=e.reasons)
+            raise HTTPException(status_code=422, detail={
+                "error": "PRETRADE_REJECTED",
+                "hint": str(e),
+                "reasons": e.reasons,
+            })
+        try:
+            status, body, headers = await order_cash(
+                req.code, req.qty, is_buy, req.market, req.price or 0, idempotency_key
+            )
+        except _SENT_TIMEOUTS as e:
+            _journal(rec, error=f"{type(e).__name__}:{e}", unknown=True)
+            raise idempotency.OutcomeUnknown((504, _UNKNOWN, {})) from e
+        except Exception as e:
+            _journal(rec, error=f"{type(e).__name__}:{e}")
+            raise
+        _journal(rec, status=status, response=body)
+        # 접수된 주문은 로컬 장부에 pending 으로 즉시 반영(시장가는 최근 시세로 금액 추정)
+        price = req.price or 0
+        if req.market:
+            q = quotes.peek(req.code, settings.PRETRADE_QUOTE_MAX_AGE)
+            price = q.price if q is not None else 0
+        book.on_order(req.code, is_buy, req.qty, req.market, price, status, body)
+        return status, body, headers
+
+    try:
+        if not idempotency_key:
+            status, body, headers = await call()
+            return status, body, headers, False
+
+        fp = f"{'B' if is_buy else 'S'}|{req.code}|{req.qty}|{int(req.market)}|{req.price or 0}"
+        (status, body, headers), replayed = await idempotency.store.run(idempotency_key, fp, call)
+    except idempotency.OutcomeUnknown:
+        raise HTTPException(status_code=504, detail=_UNKNOWN) from None
+    except idempotency.IdempotencyConflict:
+        raise HTTPException(status_code=409, detail={
+            "error": "IDEMPOTENCY_KEY_REUSED",
+            "hint": "같은 x-idempotency-key 로 다른 주문 내용이 들어왔습니다.",
+        })
+    if replayed and body == _UNKNOWN:
+        raise HTTPException(status_code=504, detail=_UNKNOWN)
+    return status, body, headers, replayed
+
+
 @router.post("/orders/stock/buy")
 async def order_buy(req: OrderReq, x_idempotency_key: str | None = Header(default=None)):
-    status, body, headers = await order_cash(
-        req.code, req.qty, True, req.market, req.price or 0, x_idempotency_key
-    )
-    return {"status_code": status, "response": body, "headers": headers}
+    status, body, headers, replayed = await _place(req, True, x_idempotency_key)
+    return {"status_code": status, "response": body, "headers": headers, "replayed": replayed}
 
 
 @router.post("/orders/stock/sell")
 async def order_sell(req: OrderReq, x_idempotency_key: str | None = Header(default=None)):
-    status, body, headers = await order_cash(
-        req.code, req.qty, False, req.market, req.price or 0, x_idempotency_key
-    )
-    return {"status_code": status, "response": body, "headers": headers}
+    status, body, headers, replayed = await _place(req, False, x_idempotency_key)
+    return {"status_code": status, "response": body, "headers": headers, "replayed": replayed}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 일괄 주문 (리밸런싱 등): 동시 실행 수 제한, 주문별 결과
+#   - stream=1 이면 끝나는 순서대로 NDJSON 한 줄씩 전송
+#   - 한 건 실패(예외)는 해당 결과에만 기록, 나머지는 계속 진행
+#   - 클라이언트가 끊기면 슬롯을 아직 못 받은(전송 전) 주문만 취소,
+#     이미 전송 중인 주문은 끝까지 처리(저널/장부 반영)
+# ───────────────────────────────────────────────────────────────────────────────
+class BatchOrderItem(OrderReq):
+    side: Literal["buy", "sell"] = Field(..., description="buy=매수, sell=매도")
+    idempotency_key: str | None = Field(None, description="주문별 x-idempotency-key")
+
+
+class BatchOrderReq(BaseModel):
+    orders: list[BatchOrderItem] = Field(..., min_length=1, max_length=1000)
+    concurrency: int | None = Field(None, ge=1, le=64, description="동시 전송 수(기본: BATCH_CONCURRENCY)")
+
+
+# 연결이 끊긴 뒤에도 끝까지 돌리는 주문 태스크(참조 유지용)
+_detached: set[asyncio.Task] = set()
+
+
+def _abandon(tasks: list[asyncio.Task], started: set[int]) -> None:
+    for i, t in enumerate(tasks):
+        if t.done():
+            continue
+        if i in started:
+            _detached.add(t)
+            t.add_done_callback(_detached.discard)
+        else:
+            t.cancel()
+
+
+async def _submit_one(idx: int, item: BatchOrderItem, sem: asyncio.Semaphore, started: set[int]) -> dict:
+    async with sem:
+        started.add(idx)
+        try:
+            status, body, headers, replayed = await _place(item, item.side == "buy", item.idempotency_key)
+        except HTTPException as e:
+            return {"index": idx, "ok": False, "code": item.code, "side": item.side,
+                    "status_code": e.status_code, "error": e.detail}
+        except Exception as e:
+            return {"index": idx, "ok": False, "code": item.code, "side": item.side,
+                    "error": f"{type(e).__name__}:{e}"}
+    return {"index": idx, "ok": status == 200, "code": item.code, "side": item.side,
+            "status_code": status, "response": body, "headers": headers, "replayed": replayed}
+
+
+@router.post("/orders/stock/batch")
+async def order_batch(req: BatchOrderReq, stream: bool = False):
+    sem = asyncio.Semaphore(req.concurrency or settings.BATCH_CONCURRENCY)
+    started: set[int] = set()
+    tasks = [asyncio.ensure_future(_submit_one(i, it, sem, started)) for i, it in enumerate(req.orders)]
+
+    if not stream:
+        try:
+            # shield: 요청이 취소돼도 gather 가 전송 중인 주문까지 취소하지 않도록
+            results = await asyncio.gather(*(asyncio.shield(t) for t in tasks))
+        except asyncio.CancelledError:
+            _abandon(tasks, started)
+            raise
+        return {"count": len(results), "ok": sum(1 for r in results if r["ok"]), "results": results}
+
+    async def _ndjson():
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield decode.dumps(await fut) + "\n"
+        finally:
+            # 클라이언트가 끊으면 아직 대기 중인 주문은 보내지 않음(전송 중인 건 마저 처리)
+            _abandon(tasks, started)
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
+# 주문 전 로컬 검증 상태 (검사/거절 건수)
+@router.get("/api/orders/pretrade")
+async def orders_pretrade():
+    return pretrade.stats()
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 주문 기록 조회 (저널, 최신순 페이지)
+# ───────────────────────────────────────────────────────────────────────────────
+@router.get("/api/orders/history")
+async def order_history(
+    date: str | None = Query(None, pattern=r"^\d{8}$", description="YYYYMMDD (기본: 오늘)"),
+    code: str | None = Query(None, description="종목코드 필터"),
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    desc: bool = True,
+):
+    day = date or time.strftime("%Y%m%d")
+    # 인덱스 꼬리 읽기/mmap 은 스레드에서
+    res = await asyncio.to_thread(journal.query, day, code, cursor, limit, desc)
+    res["days"] = journal.days()
+    return res
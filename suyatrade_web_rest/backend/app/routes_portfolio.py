@@ -0,0 +1,70 @@
+# backend/app/routes_portfolio.py
+"""
+다계좌 포트폴리오 (/api/portfolio).
+
+- settings.accounts 의 모든 계좌 요약(예수금+잔고)을 동시에 조회
+  (동시 계좌 수 PORTFOLIO_CONCURRENCY, 토큰/커넥션 풀/스케줄러는 공유)
+- PORTFOLIO_DEADLINE 안에 끝나지 않은 계좌는 취소하고 timeout 으로 표시
+  → 느린 계좌 하나가 전체 응답을 붙잡지 않음
+- 계좌별 결과 + 성공한 계좌 합계(total) 반환
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Query
+
+from .config import settings
+from .routes_account import _fetch_summary
+
+router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
+
+_SUM_KEYS = ("deposit", "orderable", "today_realized", "total_purchase", "total_eval", "total_pl")
+
+
+async def _one(cano: str, prdt: str, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    async with sem:
+        t0 = time.perf_counter()
+        try:
+            data = await _fetch_summary(cano, prdt)
+        except Exception as e:
+            return {"account": f"{cano}-{prdt}", "ok": False, "error": f"{type(e).__name__}:{e}"}
+        data["account"] = f"{cano}-{prdt}"
+        data["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return data
+
+
+def _aggregate(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total: Dict[str, Any] = {k: sum(r.get(k, 0) for r in rows) for k in _SUM_KEYS}
+    # 수익률은 합산 금액 기준으로 다시 계산
+    total["total_return"] = (
+        round(total["total_pl"] / total["total_purchase"] * 100, 2) if total["total_purchase"] else 0.0
+    )
+    return total
+
+
+@router.get("")
+async def get_portfolio(deadline: float | None = Query(None, gt=0, le=60, description="초(기본: PORTFOLIO_DEADLINE)")):
+    accounts = settings.accounts
+    sem = asyncio.Semaphore(max(1, settings.PORTFOLIO_CONCURRENCY))
+    tasks = [asyncio.ensure_future(_one(cano, prdt, sem)) for cano, prdt in accounts]
+    done, pending = await asyncio.wait(tasks, timeout=deadline or settings.PORTFOLIO_DEADLINE)
+    for t in pending:
+        t.cancel()
+
+    results = []
+    for (cano, prdt), t in zip(accounts, tasks):
+        if t in done:
+            results.append(t.result())
+        else:
+            results.append({"account": f"{cano}-{prdt}", "ok": False, "error": "DEADLINE_EXCEEDED"})
+
+    ok_rows = [r for r in results if r.get("ok") and not r.get("errors")]
+    return {
+        "accounts": results,
+        "count": len(results),
+        "complete": len(ok_rows) == len(results),
+        "total": _aggregate(ok_rows),
+    }
@@ -0,0 +1,183 @@
+# backend/app/routes_positions.py
+"""
+로컬 포지션/현금 장부 (/api/positions).
+
+- 주문 응답(접수)으로 pending 수량/예상 주문가능금액을 즉시 반영
+  (시장가 매수는 호출 측이 준 추정가(최근 시세)로 차감, 체결가를 모르므로 다음 대사에서 현금 차이는 drift 아님)
+- 체결 통보 소스가 없으므로 보유 수량/평단/pending 은 대사 때 브로커 값으로 갱신(pending 은 0 으로 리셋)
+- POSITION_RECONCILE_SECONDS 마다 브로커 잔고와 대사(reconcile) → 차이(drift) 기록 후 브로커 값으로 맞춤
+- 조회는 장부 스냅샷(버전이 바뀔 때만 재생성)을 그대로 반환 → 업스트림 호출 없음
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException
+
+from .config import settings
+from .decode import HoldingRecord
+from .routes_account import _fetch_summary, fetch_holdings
+
+router = APIRouter(prefix="/api/positions", tags=["positions"])
+
+
+class _Pos:
+    __slots__ = ("qty", "avg_price", "pending_buy", "pending_sell")
+
+    def __init__(self, qty: int = 0, avg_price: float = 0.0):
+        self.qty = qty
+        self.avg_price = avg_price
+        self.pending_buy = 0
+        self.pending_sell = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "qty": self.qty,
+            "avg_price": self.avg_price,
+            "pending_buy": self.pending_buy,
+            "pending_sell": self.pending_sell,
+        }
+
+
+class PositionBook:
+    def __init__(self) -> None:
+        self.positions: Dict[str, _Pos] = {}
+        self.cash = {"deposit": 0, "orderable": 0}
+        self.version = 0
+        self.updated_at = 0.0
+        self.reconciled_at = 0.0
+        self.last_drift: List[Dict[str, Any]] = []
+        self.reconcile_error: str | None = None
+        self._market_buys = 0               # 지난 대사 이후 접수된 시장가 매수 수(현금 drift 판단 제외)
+        self._snap: Dict[str, Any] | None = None
+        self._task: asyncio.Task | None = None
+
+    def _touch(self) -> None:
+        self.version += 1
+        self.updated_at = time.time()
+        self._snap = None
+
+    def _pos(self, code: str) -> _Pos:
+        p = self.positions.get(code)
+        if p is None:
+            p = self.positions[code] = _Pos()
+        return p
+
+    # ── 증분 반영 ───────────────────────────────────────────────────────────
+    def on_order(self, code: str, is_buy: bool, qty: int, market: bool, price: int,
+                 status: int, body: Any) -> None:
+        """주문 접수 응답 반영(접수된 것만). 시장가면 price 는 추정가(모르면 0)."""
+        if status != 200:
+            return
+        if isinstance(body, dict) and str(body.get("return_code", "0")) != "0":
+            return
+        p = self._pos(code)
+        if is_buy:
+            p.pending_buy += qty
+            # 필요한 금액만큼 주문가능금액을 미리 차감(시장가는 추정가 — 있을 때만)
+            if price:
+                self.cash["orderable"] = max(0, self.cash["orderable"] - qty * price)
+            if market:
+                self._market_buys += 1
+        else:
+            p.pending_sell += qty
+        self._touch()
+
+    # ── 대사 ────────────────────────────────────────────────────────────────
+    def reconcile(self, holdings: List[HoldingRecord], cash: Dict[str, int]) -> List[Dict[str, Any]]:
+        broker = {h.code: h for h in holdings}
+        drift: List[Dict[str, Any]] = []
+        # 첫 대사는 장부 초기화(비교 대상 없음)
+        for code in (set(broker) | set(self.positions)) if self.reconciled_at else ():
+            p = self.positions.get(code) or _Pos()
+            bq = broker[code].qty if code in broker else 0
+            # pending 으로 설명되는 차이는 drift 아님
+            if not (p.qty - p.pending_sell <= bq <= p.qty + p.pending_buy):
+                drift.append({"code": code, "book": p.qty, "broker": bq,
+                              "pending_buy": p.pending_buy, "pending_sell": p.pending_sell})
+        for key in ("deposit", "orderable"):
+            if key == "orderable" and self._market_buys:
+                continue    # 시장가 매수 금액은 추정치 → 브로커 값과 달라도 drift 아님
+            if self.reconciled_at and cash.get(key) is not None and cash[key] != self.cash[key]:
+                drift.append({"cash": key, "book": self.cash[key], "broker": cash[key]})
+
+        self.positions = {
+            code: _Pos(h.qty, h.avg_price) for code, h in broker.items() if h.qty
+        }
+        self.cash = {k: cash.get(k, self.cash[k]) for k in ("deposit", "orderable")}
+        self.reconciled_at = time.time()
+        self._market_buys = 0
+        self.last_drift = drift
+        self._touch()
+        return drift
+
+    async def reconcile_now(self) -> List[Dict[str, Any]]:
+        """
+        브로커 값을 받아 대사. 요약 중 한 쪽이라도 실패했거나 보유 페이지가 실패하면
+        (fetch_holdings 가 UpstreamStatusError) 예외 → 기존 장부 유지(0/빈 목록으로 덮지 않음).
+        """
+        try:
+            summary, holdings = await asyncio.gather(_fetch_summary(), fetch_holdings())
+            if summary["errors"]:
+                raise RuntimeError("summary: " + "; ".join(summary["errors"]))
+        except Exception as e:
+            # 스냅샷에도 보이도록(캐시된 _snap 무효화)
+            self.reconcile_error = f"{type(e).__name__}:{e}"
+            self._touch()
+            raise
+        self.reconcile_error = None
+        return self.reconcile(holdings, {"deposit": summary["deposit"], "orderable": summary["orderable"]})
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.reconcile_now()
+            except Exception:
+                pass   # reconcile_error 에 기록됨, 다음 주기에 재시도
+            await asyncio.sleep(settings.POSITION_RECONCILE_SECONDS)
+
+    def start(self) -> None:
+        if settings.POSITION_RECONCILE_SECONDS > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self._snap is None:
+            self._snap = {
+                "version": self.version,
+                "updated_at": self.updated_at,
+                "reconciled_at": self.reconciled_at,
+                "cash": dict(self.cash),
+                "positions": {c: p.as_dict() for c, p in self.positions.items()
+                              if p.qty or p.pending_buy or p.pending_sell},
+                "drift": list(self.last_drift),
+                "reconcile_error": self.reconcile_error,
+            }
+        return self._snap
+
+
+book = PositionBook()
+
+
+@router.get("")
+async def get_positions():
+    return book.snapshot()
+
+
+@router.post("/reconcile")
+async def post_reconcile():
+    try:
+        drift = await book.reconcile_now()
+    except Exception as e:
+        raise HTTPException(status_code=502, detail={"error": "RECONCILE_FAILED", "hint": str(e)})
+    return {"ok": True, "drift": drift, "reconciled_at": book.reconciled_at}
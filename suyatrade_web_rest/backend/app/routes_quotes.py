@@ -0,0 +1,162 @@
+# backend/app/routes_quotes.py
+"""
+시세 조회 (/api/quotes?codes=005930,000660,...).
+
+- 종목별 캐시(QUOTE_TTL) → 관심종목 수백 개를 여러 클라이언트가 봐도 업스트림은 종목당 TTL 1회
+- 같은 종목을 동시에 요청하면 진행 중인 조회 1건을 공유
+- 캐시에 없는 종목은 QUOTE_BATCH_WINDOW_MS 동안 모아 QUOTE_BATCH 개씩 묶어서 조회(ka10095)
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .config import settings
+from .decode import QuoteRecord
+from .kiwoom import fetch_quotes
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+# 조회 결과: (레코드|None, 오류|None)
+_Result = Tuple["QuoteRecord | None", "str | None"]
+
+
+class QuoteBook:
+    def __init__(self) -> None:
+        self._cache: Dict[str, Tuple[QuoteRecord, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_scheduled = False
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "upstream_codes": 0}
+
+    # ── 캐시 ────────────────────────────────────────────────────────────────
+    def _store(self, rec: QuoteRecord, at: float) -> None:
+        if len(self._cache) >= settings.QUOTE_CACHE_MAX and rec.code not in self._cache:
+            cutoff = at - settings.QUOTE_TTL
+            self._cache = {c: v for c, v in self._cache.items() if v[1] > cutoff}
+            if len(self._cache) >= settings.QUOTE_CACHE_MAX:
+                # 전부 유효하면 가장 오래된 것 하나 제거
+                self._cache.pop(min(self._cache, key=lambda c: self._cache[c][1]))
+        self._cache[rec.code] = (rec, at)
+
+    def peek(self, code: str, max_age: float | None = None) -> QuoteRecord | None:
+        """업스트림 호출 없이 마지막 시세. max_age(초)를 주면 그보다 오래된 건 None."""
+        hit = self._cache.get(code)
+        if hit is None or (max_age is not None and time.monotonic() - hit[1] > max_age):
+            return None
+        return hit[0]
+
+    # ── 묶음 조회 ───────────────────────────────────────────────────────────
+    def _schedule_flush(self) -> None:
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        loop = asyncio.get_running_loop()
+        loop.call_later(settings.QUOTE_BATCH_WINDOW_MS / 1000, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self) -> None:
+        self._flush_scheduled = False
+        codes, self._pending = self._pending, []
+        size = max(1, settings.QUOTE_BATCH)
+        await asyncio.gather(*(self._fetch_chunk(codes[i:i + size]) for i in range(0, len(codes), size)))
+
+    async def _fetch_chunk(self, codes: List[str]) -> None:
+        self._stats["upstream_calls"] += 1
+        self._stats["upstream_codes"] += len(codes)
+        results: Dict[str, _Result] = {}
+        try:
+            status, recs, body = await fetch_quotes(codes)
+            if status != 200:
+                err = f"HTTP {status}: {body.get('return_msg', '') if isinstance(body, dict) else ''}".strip()
+                results = {c: (None, err) for c in codes}
+            else:
+                at = time.monotonic()
+                for rec in recs:
+                    self._store(rec, at)
+                    results[rec.code] = (rec, None)
+        except Exception as e:
+            results = {c: (None, f"{type(e).__name__}:{e}") for c in codes}
+        finally:
+            for c in codes:
+                fut = self._inflight.pop(c, None)
+                if fut is not None and not fut.done():
+                    fut.set_result(results.get(c, (None, "NOT_FOUND")))
+
+    # ── 조회 ────────────────────────────────────────────────────────────────
+    async def get(self, codes: List[str]) -> Dict[str, Tuple[_Result, float]]:
+        """code -> ((레코드|None, 오류|None), 조회시각) — 요청 순서 유지."""
+        now = time.monotonic()
+        out: Dict[str, Tuple[_Result, float]] = {}
+        waits: Dict[str, asyncio.Future] = {}
+        for c in codes:
+            hit = self._cache.get(c)
+            if hit is not None and now - hit[1] < settings.QUOTE_TTL:
+                self._stats["hits"] += 1
+                out[c] = ((hit[0], None), hit[1])
+                continue
+            fut = self._inflight.get(c)
+            if fut is not None:
+                self._stats["coalesced"] += 1
+            else:
+                self._stats["misses"] += 1
+                fut = self._inflight[c] = asyncio.get_running_loop().create_future()
+                self._pending.append(c)
+            waits[c] = fut
+        if self._pending:
+            self._schedule_flush()
+
+        if waits:
+            # 한 클라이언트가 끊어도 같은 종목을 기다리는 다른 요청은 계속
+            done = await asyncio.gather(*(asyncio.shield(f) for f in waits.values()))
+            at = time.monotonic()
+            for c, res in zip(waits, done):
+                out[c] = (res, at)
+        return {c: out[c] for c in codes}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "cached": len(self._cache), "inflight": len(self._inflight)}
+
+
+quotes = QuoteBook()
+
+
+def _parse_codes(raw: List[str]) -> List[str]:
+    seen: Dict[str, None] = {}
+    for part in raw:
+        for c in part.split(","):
+            c = c.strip()
+            if c:
+                seen[c] = None
+    return list(seen)
+
+
+@router.get("")
+async def get_quotes(codes: List[str] = Query(..., description="종목코드(콤마 구분, 반복 가능)")):
+    wanted = _parse_codes(codes)
+    if not wanted:
+        raise HTTPException(status_code=400, detail={"error": "NO_CODES", "hint": "codes=005930,000660"})
+    if len(wanted) > settings.QUOTE_MAX_CODES:
+        raise HTTPException(status_code=400, detail={
+            "error": "TOO_MANY_CODES",
+            "hint": f"한 번에 최대 {settings.QUOTE_MAX_CODES}종목",
+        })
+
+    res = await quotes.get(wanted)
+    now = time.monotonic()
+    items: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for c, ((rec, err), at) in res.items():
+        if rec is None:
+            errors[c] = err or "NOT_FOUND"
+            items[c] = None
+        else:
+            items[c] = {**rec.as_dict(), "age_ms": int((now - at) * 1000)}
+    return {"count": len(items), "quotes": items, "errors": errors}
+
+
+@router.get("/stats")
+async def quote_stats():
+    return quotes.stats()
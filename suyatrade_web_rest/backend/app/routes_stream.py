@@ -0,0 +1,139 @@
+# backend/app/routes_stream.py
+"""
+계좌 요약 푸시 (/api/stream/account) — WebSocket 과 SSE 둘 다 지원.
+
+서버에서 폴러 1개만 돌면서(구독자가 있을 때만) 요약을 가져오고,
+바뀐 필드만 모든 구독자에게 뿌림 → 대시보드 수와 무관하게 업스트림 부하 일정.
+- 폴링은 refresh=True(캐시 TTL 보다 주기가 길어 캐시를 읽으면 한 주기씩 밀림, 단일 비행이라 중복 호출 없음)
+- errors 가 있는 요약(일부 값이 0)은 뿌리지 않고 error 메시지만 보냄
+- WebSocket 은 수신 태스크를 같이 돌려 끊김을 바로 감지(다음 전송까지 구독이 남지 않도록)
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+from fastapi import APIRouter, WebSocket
+from fastapi.responses import StreamingResponse
+
+from . import decode
+from .config import settings
+from .routes_account import get_account_summary
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+
+# 매번 바뀌는 메타 필드는 변경 비교에서 제외
+_META = ("as_of", "age_ms", "stale")
+
+
+class AccountHub:
+    def __init__(self) -> None:
+        self._subs: set[asyncio.Queue] = set()
+        self._last: Dict[str, Any] = {}
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=16)
+        if self._last:
+            q.put_nowait({"type": "snapshot", "data": dict(self._last)})
+        self._subs.add(q)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._poll())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subs.discard(q)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, msg: dict) -> None:
+        for q in list(self._subs):
+            if q.full():
+                # 느린 구독자: 오래된 것 버리고 최신 유지
+                try:
+                    q.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            q.put_nowait(msg)
+
+    async def _poll(self) -> None:
+        while self._subs:
+            try:
+                data = await get_account_summary(refresh=True)
+            except Exception as e:
+                self._publish({"type": "error", "error": f"{type(e).__name__}:{e}"})
+            else:
+                if data.get("errors"):
+                    self._publish({"type": "error", "error": data["errors"], "as_of": data.get("as_of")})
+                    await asyncio.sleep(settings.STREAM_POLL_INTERVAL)
+                    continue
+                cur = {k: v for k, v in data.items() if k not in _META}
+                changed = {k: v for k, v in cur.items() if self._last.get(k) != v}
+                first = not self._last
+                self._last = cur
+                if changed:
+                    self._publish({
+                        "type": "snapshot" if first else "delta",
+                        "data": cur if first else changed,
+                        "as_of": data.get("as_of"),
+                    })
+            await asyncio.sleep(settings.STREAM_POLL_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"subscribers": len(self._subs), "polling": self._task is not None and not self._task.done()}
+
+
+hub = AccountHub()
+
+
+@router.websocket("/account")
+async def stream_account_ws(ws: WebSocket):
+    await ws.accept()
+    q = hub.subscribe()
+
+    async def _send():
+        while True:
+            await ws.send_text(decode.dumps(await q.get()))
+
+    async def _recv():
+        # 클라이언트 메시지는 무시 — 끊김(close/disconnect) 감지용
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(_send()), asyncio.ensure_future(_recv())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        hub.unsubscribe(q)
+        # 끊긴 소켓에 보내다 난 예외(WebSocketDisconnect/RuntimeError)는 여기서 회수
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@router.get("/account")
+async def stream_account_sse():
+    async def _events():
+        q = hub.subscribe()
+        try:
+            while True:
+                try:
+                    msg = await asyncio.wait_for(q.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"  # 프록시가 연결을 끊지 않도록
+                    continue
+                yield f"data: {decode.dumps(msg)}\n\n"
+        finally:
+            hub.unsubscribe(q)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def stream_stats():
+    return hub.stats()
@@ -0,0 +1,267 @@
+# backend/app/scheduler.py
+"""
+업스트림 호출 스케줄러 (우선순위 + 토큰버킷).
+
+- 버킷: api_id/tr_id 별 1개 + 앱키 전체 공용 1개(RATE_LIMIT_GLOBAL_RPS)
+- 대기열은 (우선순위, 도착순) → 주문(ORDER)이 조회(QUERY)보다 항상 먼저
+    * 키별 힙 + "키별 맨 앞 대기자" 힙 → 배정 1건당 O(log n), 전체 정렬 없음
+    * 키 버킷이 비면 그 키는 토큰이 찰 시각까지 재움(그동안 다른 키 대기자가 먼저)
+- 429 응답 시 Retry-After 만큼 해당 키/전체를 멈추고 속도를 절반으로(AIMD),
+  성공할 때마다 조금씩 원래 속도로 복구
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+import httpx
+
+from . import breaker, metrics
+from .config import settings
+
+ORDER = 0
+QUERY = 1
+_PRIORITY_NAMES = {ORDER: "order", QUERY: "query"}
+
+
+class _Bucket:
+    __slots__ = ("base", "rate", "burst", "tokens", "ts", "blocked_until")
+
+    def __init__(self, rate: float, burst: float):
+        self.base = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.ts = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _fill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+
+    def wait_time(self, now: float) -> float:
+        """토큰 1개를 쓰려면 몇 초 기다려야 하는지(0이면 바로 가능)."""
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.rate <= 0:
+            return 0.0
+        self._fill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate > 0:
+            self.tokens -= 1.0
+
+    def penalize(self, now: float, retry_after: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        if self.rate <= 0:
+            return
+        self.rate = max(self.base * 0.1, self.rate * 0.5)
+        self.tokens = 0.0
+
+    def recover(self) -> None:
+        if self.rate < self.base:
+            self.rate = min(self.base, self.rate + self.base * 0.05)
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._global = _Bucket(settings.RATE_LIMIT_GLOBAL_RPS, settings.RATE_LIMIT_GLOBAL_BURST)
+        self._buckets: Dict[str, _Bucket] = {}
+        self._keyq: Dict[str, list[tuple[int, int, asyncio.Future, float]]] = {}  # 키별 대기자 힙
+        self._heads: list[tuple[int, int, str]] = []      # 깨어 있는 키의 맨 앞 대기자
+        self._head_of: Dict[str, tuple[int, int]] = {}    # 키 -> _heads 에 올라간 대기자(나머지는 낡은 항목)
+        self._sleeping: list[tuple[float, str]] = []      # (토큰 찰 시각, 키)
+        self._asleep: set[str] = set()
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._stats: Dict[str, Any] = {
+            "granted": {"order": 0, "query": 0},
+            "wait_total_ms": {"order": 0.0, "query": 0.0},
+            "wait_max_ms": {"order": 0.0, "query": 0.0},
+            "throttled_429": 0,
+        }
+
+    def _bucket(self, key: str) -> _Bucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _Bucket(settings.RATE_LIMIT_RPS, settings.RATE_LIMIT_BURST)
+        return b
+
+    # ── 대기/배정 ────────────────────────────────────────────────────────────
+    def _push_head(self, key: str) -> None:
+        """키의 맨 앞(취소된 대기자는 버림)을 _heads 에 올림. 대기자가 없으면 키 정리."""
+        q = self._keyq.get(key)
+        while q and q[0][2].done():
+            heapq.heappop(q)
+        if not q:
+            self._keyq.pop(key, None)
+            self._head_of.pop(key, None)
+            return
+        prio, seq = q[0][0], q[0][1]
+        self._head_of[key] = (prio, seq)
+        heapq.heappush(self._heads, (prio, seq, key))
+
+    def _pump(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        # 토큰이 찼을 키를 깨움
+        while self._sleeping and self._sleeping[0][0] <= now:
+            _, key = heapq.heappop(self._sleeping)
+            self._asleep.discard(key)
+            self._push_head(key)
+        next_wait: float | None = None
+        while self._heads:
+            gwait = self._global.wait_time(now)
+            if gwait > 0:
+                next_wait = gwait
+                break
+            prio, seq, key = heapq.heappop(self._heads)
+            if self._head_of.get(key) != (prio, seq):
+                continue                        # 낡은 항목(더 앞선 대기자가 올라왔거나 키가 잠듦)
+            q = self._keyq[key]
+            if q[0][2].done():                  # 취소된 대기자
+                self._push_head(key)
+                continue
+            kwait = self._bucket(key).wait_time(now)
+            if kwait > 0:
+                # 이 키는 토큰이 찰 때까지 재우고 다음 키로
+                del self._head_of[key]
+                self._asleep.add(key)
+                heapq.heappush(self._sleeping, (now + kwait, key))
+                continue
+            self._global.take()
+            self._bucket(key).take()
+            fut = heapq.heappop(q)[2]
+            fut.set_result(None)
+            self._push_head(key)
+        if self._sleeping:
+            swait = self._sleeping[0][0] - now
+            next_wait = swait if next_wait is None else min(next_wait, swait)
+        if next_wait is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_wait, self._pump)
+
+    async def acquire(self, key: str, priority: int = QUERY) -> None:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        t0 = time.monotonic()
+        w = (priority, next(self._seq), fut, t0)
+        heapq.heappush(self._keyq.setdefault(key, []), w)
+        head = self._head_of.get(key)
+        if key not in self._asleep and (head is None or w[:2] < head):
+            self._push_head(key)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._pump()
+        # 취소되면 힙에 남은 항목은 맨 앞에 올 때 버려짐(done)
+        await fut
+        name = _PRIORITY_NAMES.get(priority, "query")
+        waited = (time.monotonic() - t0) * 1000
+        self._stats["granted"][name] += 1
+        self._stats["wait_total_ms"][name] += waited
+        self._stats["wait_max_ms"][name] = max(self._stats["wait_max_ms"][name], waited)
+
+    # ── 429 적응 ─────────────────────────────────────────────────────────────
+    def feedback(self, key: str, status: int, retry_after: float | None = None) -> None:
+        now = time.monotonic()
+        if status == 429:
+            self._stats["throttled_429"] += 1
+            delay = retry_after if retry_after is not None else 1.0
+            self._bucket(key).penalize(now, delay)
+            self._global.penalize(now, delay)
+        elif status < 500:
+            self._bucket(key).recover()
+            self._global.recover()
+
+    def try_take(self, key: str) -> bool:
+        """대기 없이 슬롯을 바로 얻을 수 있으면 가져감(헤징용, 대기열 새치기 금지)."""
+        now = time.monotonic()
+        if self._keyq or self._global.wait_time(now) > 0 or self._bucket(key).wait_time(now) > 0:
+            return False
+        self._global.take()
+        self._bucket(key).take()
+        return True
+
+    async def run(
+        self,
+        key: str,
+        priority: int,
+        call: Callable[[], Awaitable[httpx.Response]],
+        hedge: bool = False,
+    ) -> httpx.Response:
+        """
+        슬롯을 받아 call() 실행. 429면 Retry-After 반영 후 RATE_LIMIT_RETRIES 회까지 재시도.
+        (429는 서버가 처리 안 한 요청이므로 주문도 재전송 안전)
+        서킷이 열려 있으면 대기열에 들어가기 전에 CircuitOpenError 로 즉시 실패.
+        hedge=True 는 멱등 조회에만 사용.
+        """
+        br = breaker.get(key)
+        for _ in range(settings.RATE_LIMIT_RETRIES + 1):
+            br.before_call()
+            t0 = time.perf_counter()
+            try:
+                await self.acquire(key, priority)
+            except BaseException:
+                br.probe_inflight = False
+                raise
+            t1 = time.perf_counter()
+            metrics.UPSTREAM_QUEUE.observe(t1 - t0, key)
+            metrics.add_timing("queue", t1 - t0)
+            metrics.UPSTREAM_INFLIGHT.inc()
+            status = "error"
+            try:
+                r = await br.call(
+                    call,
+                    is_failure=lambda resp: resp.status_code >= 500,
+                    can_hedge=(lambda: self.try_take(key)) if hedge else None,
+                    adaptive=priority != ORDER,
+                )
+                status = str(r.status_code)
+            finally:
+                metrics.UPSTREAM_INFLIGHT.dec()
+                dt = time.perf_counter() - t1
+                metrics.UPSTREAM_LATENCY.observe(dt, key, status)
+                metrics.add_timing("upstream", dt)
+            self.feedback(key, r.status_code, retry_after_seconds(r))
+            if r.status_code != 429:
+                return r
+        return r
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {"order": 0, "query": 0}
+        for q in self._keyq.values():
+            for prio, _, fut, _ in q:
+                if not fut.done():
+                    depth[_PRIORITY_NAMES.get(prio, "query")] += 1
+        avg = {
+            k: (self._stats["wait_total_ms"][k] / n if (n := self._stats["granted"][k]) else 0.0)
+            for k in ("order", "query")
+        }
+        return {
+            "queue_depth": depth,
+            "granted": dict(self._stats["granted"]),
+            "wait_avg_ms": avg,
+            "wait_max_ms": dict(self._stats["wait_max_ms"]),
+            "throttled_429": self._stats["throttled_429"],
+            "rates": {k: round(b.rate, 3) for k, b in self._buckets.items()},
+            "global_rate": round(self._global.rate, 3),
+        }
+
+
+def retry_after_seconds(r: httpx.Response) -> float | None:
+    """Retry-After(초) 파싱. 날짜 형식 등은 무시하고 None."""
+    v = r.headers.get("retry-after")
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        return None
+
+
+scheduler = Scheduler()
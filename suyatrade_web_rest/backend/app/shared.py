@@ -0,0 +1,174 @@
+# backend/app/shared.py
+"""
+워커 간 공유 상태 (uvicorn --workers N).
+
+- SHARED_STATE=memory(기본): 공유 안 함 — 모든 함수가 즉시 반환(단일 프로세스 동작 그대로)
+- SHARED_STATE=sqlite: data/shared.sqlite3 (WAL) 를 모든 워커가 같이 사용
+    * 읽기: WAL 이라 쓰기와 서로 막지 않음. 호출 측은 자기 메모리 캐시를 먼저 보고
+      없거나 만료됐을 때만 여기를 봄 → 핫패스는 프로세스 내 dict 조회
+    * 쓰기: 작은 행 1개 upsert(synchronous=NORMAL, fsync 없음)
+    * lease(): 만료 시각이 있는 행으로 만든 워커 간 락(죽은 워커가 잡고 있어도 TTL 뒤 해제)
+    * sqlite 호출(busy 대기 포함)은 asyncio.to_thread 로 — 경합 중에도 이벤트 루프를 막지 않음
+      (호출 측 API 는 전부 async, 공유 끔이면 스레드 전환 없이 바로 반환)
+
+네임스페이스별 키 → JSON 값 + 만료 시각(epoch).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict
+
+from . import decode
+from .config import settings
+from .storage import SHARED_DB
+
+_OWNER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class SqliteBackend:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False, timeout=0.2)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " ns TEXT NOT NULL, k TEXT NOT NULL, v TEXT NOT NULL, exp REAL NOT NULL,"
+            " PRIMARY KEY (ns, k)) WITHOUT ROWID"
+        )
+        self._stats = {"reads": 0, "writes": 0, "errors": 0}
+
+    def get(self, ns: str, key: str) -> Any | None:
+        self._stats["reads"] += 1
+        with self._lock:
+            row = self._db.execute(
+                "SELECT v FROM kv WHERE ns=? AND k=? AND exp>?", (ns, key, time.time())
+            ).fetchone()
+        return decode.loads(row[0]) if row else None
+
+    def put(self, ns: str, key: str, value: Any, ttl: float) -> None:
+        self._stats["writes"] += 1
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO kv(ns, k, v, exp) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(ns, k) DO UPDATE SET v=excluded.v, exp=excluded.exp",
+                (ns, key, decode.dumps(value), time.time() + ttl),
+            )
+
+    def add(self, ns: str, key: str, value: Any, ttl: float) -> bool:
+        """없거나 만료된 경우에만 기록(원자적). 기록했으면 True."""
+        self._stats["writes"] += 1
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO kv(ns, k, v, exp) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(ns, k) DO UPDATE SET v=excluded.v, exp=excluded.exp WHERE kv.exp<=?",
+                (ns, key, decode.dumps(value), now + ttl, now),
+            )
+        return cur.rowcount == 1
+
+    def delete(self, ns: str, key: str, value: Any = None) -> None:
+        """value 를 주면 값이 같을 때만 삭제(내가 잡은 lease 만 풀기)."""
+        with self._lock:
+            if value is None:
+                self._db.execute("DELETE FROM kv WHERE ns=? AND k=?", (ns, key))
+            else:
+                self._db.execute("DELETE FROM kv WHERE ns=? AND k=? AND v=?", (ns, key, decode.dumps(value)))
+
+    def purge(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM kv WHERE exp<=?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT ns, COUNT(*) FROM kv GROUP BY ns").fetchall()
+        return {**self._stats, "path": str(self.path), "keys": dict(rows)}
+
+
+def _build() -> SqliteBackend | None:
+    if settings.SHARED_STATE == "sqlite":
+        return SqliteBackend(Path(settings.SHARED_STATE_PATH) if settings.SHARED_STATE_PATH else SHARED_DB)
+    return None
+
+
+_backend = _build()
+enabled = _backend is not None
+
+
+# ── 호출 측 API (공유 끔이면 no-op, 공유 저장소 오류는 로컬 동작으로 폴백) ─────
+async def _call(fn, *args, default: Any = None) -> Any:
+    try:
+        return await asyncio.to_thread(fn, *args)
+    except sqlite3.Error:
+        _backend._stats["errors"] += 1
+        return default
+
+
+async def get(ns: str, key: str) -> Any | None:
+    if _backend is None:
+        return None
+    return await _call(_backend.get, ns, key)
+
+
+async def put(ns: str, key: str, value: Any, ttl: float) -> None:
+    if _backend is None or ttl <= 0:
+        return
+    await _call(_backend.put, ns, key, value, ttl)
+
+
+async def add(ns: str, key: str, value: Any, ttl: float) -> bool:
+    if _backend is None:
+        return True
+    return await _call(_backend.add, ns, key, value, ttl, default=True)
+
+
+async def delete(ns: str, key: str, value: Any = None) -> None:
+    if _backend is None:
+        return
+    await _call(_backend.delete, ns, key, value)
+
+
+@asynccontextmanager
+async def lease(name: str, ttl: float, wait: float | None = None) -> AsyncIterator[bool]:
+    """
+    워커 간 락. 잡으면 True, wait(기본 ttl) 안에 못 잡으면 False 로 진행
+    (락 때문에 요청이 멈추지 않도록 — 최악의 경우 중복 호출 1번).
+    """
+    if _backend is None:
+        yield True
+        return
+    deadline = time.monotonic() + (ttl if wait is None else wait)
+    got = await add("lease", name, _OWNER, ttl)
+    delay = 0.02
+    while not got and time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.2)     # 오래 잡혀 있으면 시도 간격을 늘림
+        got = await add("lease", name, _OWNER, ttl)
+    try:
+        yield got
+    finally:
+        if got:
+            await delete("lease", name, _OWNER)
+
+
+def _stats_sync() -> Dict[str, Any]:
+    try:
+        purged = _backend.purge()
+        return {"backend": "sqlite", "owner": _OWNER, "purged": purged, **_backend.stats()}
+    except sqlite3.Error as e:
+        return {"backend": "sqlite", "error": str(e)}
+
+
+async def stats() -> Dict[str, Any]:
+    if _backend is None:
+        return {"backend": "memory"}
+    return await asyncio.to_thread(_stats_sync)
@@ -0,0 +1,317 @@
+# backend/app/slicer.py
+"""
+모주문 분할 실행 (TWAP / 아이스버그).
+
+- 모주문 1건 → 자식 주문 여러 건을 order_cash 로 전송(_place 경유: 사전검증/멱등/저널/장부 그대로)
+    * twap: duration 동안 interval 마다 남은 수량을 남은 회차로 나눠 전송
+    * iceberg: display_qty 씩, 앞 자식이 끝나고 interval 뒤에 다음 자식
+- 타이머: 해시 타이밍 휠 1개(SLICE_TICK_MS 단위 슬롯). 모주문마다 task/폴링 없음
+    * 휠이 비면 타이머도 멈춤, 다시 등록되면 재개
+    * 한 틱에 몰린 모주문은 대기열에 넣고 SLICE_MAX_INFLIGHT 개씩만 동시에 전송
+      (업스트림 속도 제한은 order_cash → scheduler 가 그대로 적용)
+- 자식 결과로 모주문별 접수 수량/주문번호 집계. 실패한 수량은 다음 회차로 넘김,
+  연속 SLICE_MAX_ERRORS 회 실패 또는 사전검증 거절이면 모주문 중단(failed)
+- 결과를 모르는 자식(504 ORDER_OUTCOME_UNKNOWN: 접수됐을 수 있음)은 unknown_qty 로 잡아 두고
+  모주문 중단 — 새 키로 다시 보내면 두 번 체결될 수 있으므로 주문 내역/대사로 확인 후 재주문
+- 메모리에만 보관(재시작하면 진행 중 모주문은 사라짐 — 이미 나간 자식은 저널에 남음)
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List
+
+from fastapi import HTTPException
+
+from .config import settings
+from .routes_orders import _UNKNOWN, OrderReq, _place
+
+ACTIVE, DONE, CANCELLED, FAILED = "active", "done", "cancelled", "failed"
+
+_CHILD_HISTORY = 50     # 모주문별로 보관할 최근 자식 수
+
+
+class _Wheel:
+    """해시 타이밍 휠: 슬롯 = 목표 틱 % 크기, 한 바퀴를 넘는 건 rounds 로 센다."""
+
+    def __init__(self, slots: int):
+        self.slots: List[Dict[str, int]] = [{} for _ in range(max(8, slots))]
+        self.cur = 0                        # 지금까지 진행한 틱 수
+        self._where: Dict[str, int] = {}    # pid -> 슬롯 번호
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(self, pid: str, ticks: int) -> None:
+        self.remove(pid)
+        ticks = max(1, ticks)
+        n = len(self.slots)
+        slot = (self.cur + ticks) % n
+        self.slots[slot][pid] = (ticks - 1) // n
+        self._where[pid] = slot
+
+    def remove(self, pid: str) -> None:
+        slot = self._where.pop(pid, None)
+        if slot is not None:
+            self.slots[slot].pop(pid, None)
+
+    def advance(self) -> List[str]:
+        """한 틱 진행 → 만기된 pid 목록."""
+        self.cur += 1
+        bucket = self.slots[self.cur % len(self.slots)]
+        due = [pid for pid, rounds in bucket.items() if rounds == 0]
+        for pid in due:
+            del bucket[pid]
+            del self._where[pid]
+        for pid in bucket:
+            bucket[pid] -= 1
+        return due
+
+
+class Parent:
+    __slots__ = ("id", "side", "code", "qty", "market", "price", "policy", "interval", "duration",
+                 "slices", "display_qty", "status", "reason", "created", "start", "finished",
+                 "accepted", "inflight", "failed_qty", "unknown_qty", "sent", "errors", "ord_nos", "children")
+
+    def __init__(self, pid: str, side: str, code: str, qty: int, market: bool, price: int,
+                 policy: str, interval: float, duration: float, slices: int, display_qty: int):
+        self.id = pid
+        self.side = side
+        self.code = code
+        self.qty = qty
+        self.market = market
+        self.price = price
+        self.policy = policy
+        self.interval = interval
+        self.duration = duration
+        self.slices = slices
+        self.display_qty = display_qty
+        self.status = ACTIVE
+        self.reason: Any = None
+        self.created = time.time()
+        self.start = time.monotonic()
+        self.finished: float | None = None
+        self.accepted = 0                   # 브로커가 접수한 수량
+        self.inflight = 0                   # 전송 중인 자식 수량
+        self.failed_qty = 0                 # 실패해서 다시 보낼 수량(누적 통계)
+        self.unknown_qty = 0                # 결과 모름(접수됐을 수 있음) — 다시 보내지 않음
+        self.sent = 0                       # 보낸 자식 수
+        self.errors = 0                     # 연속 실패 수
+        self.ord_nos: List[str] = []
+        self.children: Deque[Dict[str, Any]] = deque(maxlen=_CHILD_HISTORY)
+
+    @property
+    def remaining(self) -> int:
+        return self.qty - self.accepted - self.inflight - self.unknown_qty
+
+    def next_qty(self, now: float) -> int:
+        left = self.remaining
+        if left <= 0:
+            return 0
+        if self.policy == "iceberg":
+            return min(self.display_qty, left)
+        # twap: 남은 수량 / 남은 회차(끝난 뒤엔 남은 전부)
+        slots_left = self.slices - int((now - self.start) / self.interval)
+        return left if slots_left <= 1 else math.ceil(left / slots_left)
+
+    def next_delay(self, now: float) -> float:
+        if self.policy == "twap":
+            # 시작 시각 기준 격자(자식 처리 시간이 밀려도 누적 지연 없음)
+            k = int((now - self.start) / self.interval) + 1
+            if k < self.slices:
+                return max(0.0, self.start + k * self.interval - now)
+        return self.interval
+
+    def as_dict(self, children: bool = False) -> Dict[str, Any]:
+        out = {
+            "id": self.id, "side": self.side, "code": self.code, "qty": self.qty,
+            "market": self.market, "price": self.price, "policy": self.policy,
+            "interval": self.interval, "status": self.status, "reason": self.reason,
+            "accepted": self.accepted, "inflight": self.inflight, "remaining": max(0, self.remaining),
+            "sent": self.sent, "failed_qty": self.failed_qty, "unknown_qty": self.unknown_qty,
+            "ord_nos": self.ord_nos[-_CHILD_HISTORY:],
+            "created": self.created,
+            "elapsed": round((self.finished or time.monotonic()) - self.start, 3),
+        }
+        if self.policy == "twap":
+            out.update(duration=self.duration, slices=self.slices)
+        else:
+            out["display_qty"] = self.display_qty
+        if children:
+            out["children"] = list(self.children)
+        return out
+
+
+class Slicer:
+    def __init__(self) -> None:
+        self._parents: "OrderedDict[str, Parent]" = OrderedDict()
+        self._wheel = _Wheel(settings.SLICE_WHEEL_SLOTS)
+        self._tick = settings.SLICE_TICK_MS / 1000
+        self._t0 = 0.0                      # 휠 cur=0 에 해당하는 loop.time()
+        self._timer: asyncio.TimerHandle | None = None
+        self._ready: Deque[str] = deque()   # 만기됐지만 동시 전송 한도로 대기 중
+        self._tasks: set[asyncio.Task] = set()
+        self._seq = itertools.count(1)
+        self._stats = {"parents": 0, "children": 0, "accepted": 0, "failed": 0, "unknown": 0, "ticks": 0}
+
+    # ── 타이머 휠 ───────────────────────────────────────────────────────────
+    def _arm(self) -> None:
+        if self._timer is not None or not len(self._wheel):
+            return
+        loop = asyncio.get_running_loop()
+        # 멈춰 있던 동안의 틱은 건너뜀(cur 기준점을 지금으로)
+        self._t0 = loop.time() - self._wheel.cur * self._tick
+        self._timer = loop.call_at(self._t0 + (self._wheel.cur + 1) * self._tick, self._on_tick)
+
+    def _on_tick(self) -> None:
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # 이벤트 루프가 밀렸으면 놓친 틱까지 한 번에 진행
+        while len(self._wheel) and self._t0 + (self._wheel.cur + 1) * self._tick <= now:
+            self._stats["ticks"] += 1
+            self._ready.extend(self._wheel.advance())
+        self._drain()
+        if len(self._wheel):
+            self._timer = loop.call_at(self._t0 + (self._wheel.cur + 1) * self._tick, self._on_tick)
+
+    def _schedule(self, p: Parent, delay: float) -> None:
+        self._wheel.add(p.id, math.ceil(delay / self._tick))
+        self._arm()
+
+    # ── 자식 전송 ───────────────────────────────────────────────────────────
+    def _drain(self) -> None:
+        now = time.monotonic()
+        while self._ready and len(self._tasks) < settings.SLICE_MAX_INFLIGHT:
+            p = self._parents.get(self._ready.popleft())
+            if p is None or p.status != ACTIVE:
+                continue
+            qty = p.next_qty(now)
+            if qty <= 0:
+                continue
+            p.inflight += qty
+            t = asyncio.ensure_future(self._child(p, qty))
+            self._tasks.add(t)
+            t.add_done_callback(self._child_done)
+
+    def _child_done(self, t: asyncio.Task) -> None:
+        # 슬롯이 비었으니 대기 중인 모주문 전송
+        self._tasks.discard(t)
+        self._drain()
+
+    async def _child(self, p: Parent, qty: int) -> None:
+        n = next(self._seq)
+        p.sent += 1
+        self._stats["children"] += 1
+        child: Dict[str, Any] = {"n": p.sent, "qty": qty, "ts": time.time()}
+        req = OrderReq(code=p.code, qty=qty, market=p.market, price=p.price)
+        unknown = False
+        try:
+            status, body, _, _ = await _place(req, p.side == "buy", f"algo-{p.id}-{n}")
+            ok = status == 200 and not (isinstance(body, dict) and str(body.get("return_code", "0")) != "0")
+            child["status"] = status
+            if isinstance(body, dict):
+                child["ord_no"] = body.get("ord_no")
+                if not ok:
+                    child["msg"] = body.get("return_msg")
+        except HTTPException as e:
+            ok = False
+            child.update(status=e.status_code, error=e.detail)
+            if e.status_code == 422:
+                # 사전검증 거절은 다시 보내도 같은 결과 → 모주문 중단
+                self._finish(p, FAILED, e.detail)
+            elif e.detail == _UNKNOWN:
+                unknown = True
+        except Exception as e:
+            ok = False
+            child["error"] = f"{type(e).__name__}:{e}"
+        finally:
+            p.inflight -= qty
+        p.children.append(child)
+
+        if unknown:
+            p.unknown_qty += qty
+            self._stats["unknown"] += qty
+            self._finish(p, FAILED, _UNKNOWN)
+        elif ok:
+            p.accepted += qty
+            p.errors = 0
+            self._stats["accepted"] += qty
+            if child.get("ord_no"):
+                p.ord_nos.append(child["ord_no"])
+        else:
+            p.failed_qty += qty
+            p.errors += 1
+            self._stats["failed"] += 1
+            if p.status == ACTIVE and p.errors >= settings.SLICE_MAX_ERRORS:
+                self._finish(p, FAILED, child.get("error") or child.get("msg") or f"HTTP {child.get('status')}")
+
+        if p.status == ACTIVE:
+            if p.remaining <= 0:
+                self._finish(p, DONE)
+            else:
+                self._schedule(p, p.next_delay(time.monotonic()))
+
+    def _finish(self, p: Parent, status: str, reason: Any = None) -> None:
+        if p.status != ACTIVE:
+            return
+        p.status = status
+        p.reason = reason
+        p.finished = time.monotonic()
+        self._wheel.remove(p.id)
+        # 끝난 모주문은 SLICE_KEEP_DONE 개까지만 보관(오래된 것부터 제거)
+        done = [pid for pid, q in self._parents.items() if q.status != ACTIVE]
+        for pid in done[: max(0, len(done) - settings.SLICE_KEEP_DONE)]:
+            del self._parents[pid]
+
+    # ── 외부 API ────────────────────────────────────────────────────────────
+    @property
+    def active(self) -> int:
+        return sum(1 for p in self._parents.values() if p.status == ACTIVE)
+
+    def submit(self, p: Parent) -> Parent:
+        self._parents[p.id] = p
+        self._stats["parents"] += 1
+        self._ready.append(p.id)           # 첫 자식은 바로
+        self._drain()
+        return p
+
+    def get(self, pid: str) -> Parent | None:
+        return self._parents.get(pid)
+
+    def parents(self, status: str | None = None) -> List[Parent]:
+        return [p for p in self._parents.values() if status is None or p.status == status]
+
+    def cancel(self, pid: str) -> Parent | None:
+        """남은 자식 전송 중단(이미 전송 중인 자식은 그대로 끝까지)."""
+        p = self._parents.get(pid)
+        if p is not None:
+            self._finish(p, CANCELLED, "cancelled")
+        return p
+
+    async def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for p in list(self._parents.values()):
+            self._finish(p, CANCELLED, "shutdown")
+        # 전송 중인 자식은 결과까지 기다림(주문이 나갔는지 저널에 남도록)
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=settings.HTTP_TIMEOUT)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "active": self.active,
+            "kept": len(self._parents),
+            "scheduled": len(self._wheel),
+            "ready": len(self._ready),
+            "inflight": len(self._tasks),
+            "timer": self._timer is not None,
+        }
+
+
+slicer = Slicer()
@@ -0,0 +1,182 @@
+# backend/app/static_assets.py
+"""
+대시보드 정적 파일 서빙 (/web, 미리 압축 + 강한 캐시).
+
+- 기동 시 web/ 전체를 읽어 gzip(항상)/brotli(설치돼 있으면) 변형을 한 번만 만들어 메모리에 둠
+  → 요청마다 디스크 읽기/압축 없음
+- 정적 자원(app.js, style.css 등)은 내용 해시가 붙은 이름으로도 제공:
+    /web/app.3f2a9c1d0b.js  → Cache-Control: immutable (1년)
+  index.html 안의 ./app.js?v=... 참조는 기동 시 해시 이름으로 바꿔서 내보냄
+- index.html / 원래 이름은 no-cache + 강한 ETag → 재방문 시 304 (본문 없음)
+- Accept-Encoding 에 맞춰 br > gzip > 원본 선택, 표현마다 ETag 가 다름(Vary: Accept-Encoding)
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, RedirectResponse, Response
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_REVALIDATE = "no-cache"
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_REF = re.compile(r'(src|href)=(["\'])(\./)?([^"\'?#:/][^"\'?#:]*)(?:\?[^"\']*)?\2')
+
+
+class _Asset:
+    __slots__ = ("media_type", "cache_control", "variants")
+
+    def __init__(self, media_type: str, cache_control: str, variants: Dict[str, Tuple[bytes, str]]):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants          # 인코딩("identity"|"gzip"|"br") -> (본문, ETag)
+
+
+def _variants(data: bytes, digest: str, media_type: str) -> Dict[str, Tuple[bytes, str]]:
+    out = {"identity": (data, f'"{digest}"')}
+    if len(data) < settings.STATIC_MIN_COMPRESS or not media_type.startswith(_COMPRESSIBLE):
+        return out
+    gz = gzip.compress(data, 9, mtime=0)
+    if len(gz) < len(data):
+        out["gzip"] = (gz, f'"{digest}-gz"')
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            out["br"] = (br, f'"{digest}-br"')
+    return out
+
+
+def _accepts(header: str) -> List[str]:
+    """Accept-Encoding → 허용 인코딩(q=0 제외)."""
+    ok = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if name and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            ok.append(name.strip().lower())
+    return ok
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class PrecompressedStatic:
+    """StaticFiles(html=True) 대체 ASGI 앱. 파일 목록은 기동 시 고정(변경 반영은 재시작)."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._assets: Dict[str, _Asset] = {}
+        self._hashed: Dict[str, str] = {}      # 원래 이름 -> 해시 이름
+        self._stats = {"hits": 0, "not_modified": 0, "not_found": 0, "bytes": 0}
+        self._build()
+
+    # ── 기동 시 빌드 ────────────────────────────────────────────────────────
+    def _build(self) -> None:
+        files = sorted(p for p in self.directory.rglob("*") if p.is_file())
+        pages = [p for p in files if p.suffix == ".html"]
+        for p in files:
+            if p.suffix == ".html":
+                continue
+            rel = p.relative_to(self.directory).as_posix()
+            data = p.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            media_type = mimetypes.guess_type(p.name)[0] or "application/octet-stream"
+            variants = _variants(data, digest, media_type)
+            hashed = f"{rel[: -len(p.suffix)]}.{digest}{p.suffix}" if p.suffix else f"{rel}.{digest}"
+            self._hashed[rel] = hashed
+            self._assets[hashed] = _Asset(media_type, _IMMUTABLE, variants)
+            self._assets[rel] = _Asset(media_type, _REVALIDATE, variants)
+
+        # html 안의 ./app.js?v=... 같은 상대 참조를 해시 이름으로 교체
+        for p in pages:
+            rel = p.relative_to(self.directory).as_posix()
+            text = p.read_text(encoding="utf-8")
+            base = rel.rpartition("/")[0]
+            text = self._rewrite(text, base)
+            data = text.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            self._assets[rel] = _Asset("text/html", _REVALIDATE, _variants(data, digest, "text/html"))
+
+    def _rewrite(self, html: str, base: str) -> str:
+        def repl(m: re.Match) -> str:
+            attr, quote, dot, ref = m.group(1, 2, 3, 4)
+            hashed = self._hashed.get(f"{base}/{ref}" if base else ref)
+            if hashed is None:
+                return m.group(0)
+            name = hashed[len(base) + 1:] if base else hashed
+            return f"{attr}={quote}{dot or ''}{name}{quote}"
+
+        # 상대 경로만(스킴/절대경로 제외). 기존 ?v= 캐시버스터는 해시로 대체되므로 버림
+        return _REF.sub(repl, html)
+
+    # ── 요청 처리 ───────────────────────────────────────────────────────────
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            raise RuntimeError("PrecompressedStatic 은 http 만 처리")
+        request = Request(scope, receive)
+        response = self._respond(request)
+        await response(scope, receive, send)
+
+    def _respond(self, request: Request) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        path = request.scope["path"]
+        root = request.scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        if not path:
+            # /web → /web/ (상대 경로 ./app.js 가 맞게 풀리도록)
+            return RedirectResponse(url=request.url.replace(path=request.url.path + "/"))
+        rel = path.lstrip("/")
+        if not rel or rel.endswith("/"):
+            rel += "index.html"
+        asset = self._assets.get(rel)
+        if asset is None:
+            self._stats["not_found"] += 1
+            return PlainTextResponse("Not Found", status_code=404)
+
+        accepted = _accepts(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in asset.variants and e in accepted), "identity")
+        body, etag = asset.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        inm = request.headers.get("if-none-match")
+        if inm is not None and _etag_matches(inm, etag):
+            self._stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        self._stats["hits"] += 1
+        self._stats["bytes"] += len(body)
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=asset.media_type)
+        return Response(body, headers=headers, media_type=asset.media_type)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "brotli": brotli is not None,
+            "assets": {
+                rel: {k: len(v[0]) for k, v in a.variants.items()}
+                for rel, a in self._assets.items() if rel not in self._hashed
+            },
+            "hashed": self._hashed,
+        }
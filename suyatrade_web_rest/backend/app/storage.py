@@ -1,6 +1,8 @@
 # backend/app/storage.py
 from __future__ import annotations
 from pathlib import Path
+from typing import Callable
+import asyncio
 import json
 
 # 저장 위치: 프로젝트 루트의 data 폴더 (없으면 자동 생성)
@@ -11,6 +13,10 @@ _DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 SETTINGS_FILE = _DATA_DIR / "general_settings.json"
 TELEGRAM_FILE = _DATA_DIR / "telegram_settings.json"
+TOKEN_FILE = _DATA_DIR / "token_cache.json"
+IDEMPOTENCY_FILE = _DATA_DIR / "idempotency.ndjson"
+JOURNAL_DIR = _DATA_DIR / "journal"
+SHARED_DB = _DATA_DIR / "shared.sqlite3"
 
 _DEFAULTS_GENERAL = {
     "layout": "layout3",
@@ -30,47 +36,119 @@ def _safe_write_json(path: Path, payload: dict) -> None:
         json.dump(payload, f, ensure_ascii=False, indent=2)
     tmp.replace(path)
 
-# -----------------------
-# General Settings (웹)
-# -----------------------
-def load_settings() -> dict:
-    if not SETTINGS_FILE.exists():
-        return dict(_DEFAULTS_GENERAL)
+def _read_json(path: Path) -> dict:
     try:
-        with SETTINGS_FILE.open("r", encoding="utf-8") as f:
+        with path.open("r", encoding="utf-8") as f:
             data = json.load(f)
-        for k, v in _DEFAULTS_GENERAL.items():
-            data.setdefault(k, v)
-        return data
+        return data if isinstance(data, dict) else {}
     except Exception:
-        return dict(_DEFAULTS_GENERAL)
+        return {}
 
-def save_settings(payload: dict) -> None:
-    data = dict(_DEFAULTS_GENERAL)
-    if isinstance(payload, dict):
-        data.update(payload)
-    _safe_write_json(SETTINGS_FILE, data)
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
 
 # -----------------------
-# Telegram Settings (웹)
+# JSON 파일 저장소 (data/ 아래 작은 상태 파일 공용)
+#   - 메모리 캐시, 파일 mtime 이 바뀌면(다른 워커/수동 편집) 다시 읽음
+#   - 실제 읽기/쓰기는 스레드에서(이벤트 루프 안 막음)
+#   - delay 안에 몰린 저장은 마지막 값으로 1번만 원자적 쓰기
 # -----------------------
-def load_telegram_settings() -> dict:
-    if not TELEGRAM_FILE.exists():
-        return dict(_DEFAULTS_TELEGRAM)
-    try:
-        with TELEGRAM_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        for k, v in _DEFAULTS_TELEGRAM.items():
-            data.setdefault(k, v)
+class JsonFileStore:
+    def __init__(
+        self,
+        path: Path,
+        defaults: dict | None = None,
+        normalize: Callable[[dict], dict] | None = None,
+        delay: float = 0.05,
+    ):
+        self.path = path
+        self.defaults = dict(defaults or {})
+        self._normalize = normalize
+        self.delay = delay
+        self._data: dict | None = None
+        self._mtime: int | None = None
+        self._pending: asyncio.Future | None = None   # 다음 쓰기를 기다리는 저장들
+        self._write_lock = asyncio.Lock()
+
+    async def load(self) -> dict:
+        m = _mtime(self.path)
+        # 쓰기 대기 중이면 메모리 값이 최신
+        if self._data is None or (m != self._mtime and self._pending is None):
+            self._data = await asyncio.to_thread(_read_json, self.path)
+            self._mtime = m
+        data = dict(self.defaults)
+        data.update(self._data)
         return data
-    except Exception:
-        return dict(_DEFAULTS_TELEGRAM)
 
-def save_telegram_settings(payload: dict) -> None:
+    async def save(self, payload: dict) -> None:
+        if self._normalize is not None:
+            data = self._normalize(payload)
+        else:
+            data = dict(self.defaults)
+            if isinstance(payload, dict):
+                data.update(payload)
+        self._data = data
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().create_future()
+            asyncio.ensure_future(self._flush())
+        # 쓰기 실패는 저장한 쪽에 그대로 전달
+        await asyncio.shield(self._pending)
+
+    async def _flush(self) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        fut, self._pending = self._pending, None
+        async with self._write_lock:
+            snapshot = dict(self._data or {})
+            try:
+                await asyncio.to_thread(_safe_write_json, self.path, snapshot)
+                self._mtime = _mtime(self.path)
+            except Exception as e:
+                fut.set_exception(e)
+                fut.exception()
+            else:
+                fut.set_result(None)
+
+def _normalize_telegram(payload: dict) -> dict:
     data = dict(_DEFAULTS_TELEGRAM)
     if isinstance(payload, dict):
         # 불필요한 키 제거 & 타입 정리
         data["enabled"] = bool(payload.get("enabled", False))
         data["token"] = str(payload.get("token", "") or "")
         data["chat_id"] = str(payload.get("chat_id", "") or "")
-    _safe_write_json(TELEGRAM_FILE, data)
+    return data
+
+settings_store = JsonFileStore(SETTINGS_FILE, _DEFAULTS_GENERAL)
+telegram_store = JsonFileStore(TELEGRAM_FILE, _DEFAULTS_TELEGRAM, normalize=_normalize_telegram)
+# 토큰은 발급 직후 다른 워커가 바로 볼 수 있게 지연 없이 기록
+token_store = JsonFileStore(TOKEN_FILE, delay=0)
+
+# -----------------------
+# General Settings (웹)
+# -----------------------
+async def load_settings() -> dict:
+    return await settings_store.load()
+
+async def save_settings(payload: dict) -> None:
+    await settings_store.save(payload)
+
+# -----------------------
+# Telegram Settings (웹)
+# -----------------------
+async def load_telegram_settings() -> dict:
+    return await telegram_store.load()
+
+async def save_telegram_settings(payload: dict) -> None:
+    await telegram_store.save(payload)
+
+# -----------------------
+# Access Token 캐시 (재시작/멀티 워커 공유)
+# -----------------------
+async def load_token_cache() -> dict:
+    return await token_store.load()
+
+async def save_token_cache(payload: dict) -> None:
+    await token_store.save(payload)
@@ -0,0 +1,119 @@
+# backend/app/upstream.py
+"""
+키움(모의) 업스트림 호출용 프로세스 전역 httpx 클라이언트.
+
+- main.py lifespan 에서 startup()/shutdown() 으로 열고 닫음
+- 모든 모듈은 get_client() 로 같은 커넥션 풀을 공유(keep-alive, HTTP/2)
+- pool_stats() 로 커넥션 재사용 여부를 확인
+- UPSTREAM_RECORD / UPSTREAM_REPLAY 면 transport 를 녹화/재생용으로 교체(recorder.py)
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+
+from . import recorder
+from .config import settings
+
+_client: httpx.AsyncClient | None = None
+
+# 요청 수 vs 새 TCP 연결 수 → 재사용률 계산용
+_stats: Dict[str, int] = {"requests": 0, "new_connections": 0}
+
+
+def _http2_available() -> bool:
+    if not settings.HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx[http2] 설치 시에만 존재)
+    except ImportError:
+        return False
+    return True
+
+
+async def _trace(event: str, info: dict) -> None:
+    # httpcore trace 이벤트 중 TCP 연결 완료만 센다
+    if event == "connection.connect_tcp.complete":
+        _stats["new_connections"] += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _stats["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+    transport: httpx.AsyncBaseTransport
+    if settings.UPSTREAM_REPLAY:
+        # 네트워크 없이 녹화본으로 응답
+        transport = recorder.ReplayTransport(Path(settings.UPSTREAM_REPLAY), settings.REPLAY_SPEED)
+    else:
+        transport = httpx.AsyncHTTPTransport(http2=_http2_available(), limits=limits, verify=True)
+        if settings.UPSTREAM_RECORD:
+            transport = recorder.RecordingTransport(transport, Path(settings.UPSTREAM_RECORD))
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=timeout,
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    공유 클라이언트 반환. lifespan 밖(스크립트 등)에서 불려도 지연 생성.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def startup() -> None:
+    get_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def pool_stats() -> Dict[str, Any]:
+    """커넥션 풀 상태(진단용)."""
+    out: Dict[str, Any] = {
+        "open": _client is not None and not _client.is_closed,
+        "http2": _http2_available(),
+        "requests": _stats["requests"],
+        "new_connections": _stats["new_connections"],
+        "reused": max(0, _stats["requests"] - _stats["new_connections"]),
+        "limits": {
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive": settings.HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+        },
+        "connections": 0,
+        "idle": 0,
+    }
+    # httpcore 내부 풀은 공개 API가 아니므로 없으면 조용히 생략(녹화 중이면 감싼 transport 안쪽)
+    transport = getattr(_client, "_transport", None)
+    pool = getattr(getattr(transport, "inner", transport), "_pool", None)
+    conns = list(getattr(pool, "connections", []) or [])
+    out["connections"] = len(conns)
+    out["idle"] = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+    return out
+
+
+def recorder_stats() -> Dict[str, Any]:
+    transport = getattr(_client, "_transport", None)
+    if isinstance(transport, (recorder.RecordingTransport, recorder.ReplayTransport)):
+        return transport.stats()
+    return {"mode": "off"}
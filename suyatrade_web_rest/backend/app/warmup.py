@@ -0,0 +1,103 @@
+# backend/app/warmup.py
+"""
+기동 직후 예열 (lifespan 에서 백그라운드로 실행).
+
+1) 커넥션: 업스트림으로 WARMUP_CONNECTIONS 개 동시 요청 → DNS/TLS 끝난 커넥션을 풀에 채워 둠
+   토큰: 동시에 발급(또는 디스크/공유 저장소에서 로드)
+2) 후보 엔드포인트 학습(예수금/잔고) + 계좌 요약 캐시 채우기
+
+끝나기 전까지 /api/ready 는 503 → 오케스트레이터가 트래픽을 일찍 보내지 않도록.
+단계가 실패해도 예열은 끝난 것으로 보고 ready(실패 단계는 degraded 에 표시):
+첫 요청이 그 단계를 다시 시도하면 되므로 서비스를 막을 이유는 없음.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from . import auth, kiwoom
+from .config import settings
+from .routes_account import _summary_refresh_shared
+from .upstream import get_client
+
+_state: Dict[str, Any] = {"ready": False, "started_at": None, "finished_at": None, "steps": {}}
+_task: asyncio.Task | None = None
+
+
+async def _step(name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+    t0 = time.perf_counter()
+    try:
+        await fn()
+        _state["steps"][name] = {"ok": True}
+    except Exception as e:
+        _state["steps"][name] = {"ok": False, "error": f"{type(e).__name__}:{e}"}
+    _state["steps"][name]["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+
+async def _connections() -> None:
+    client = get_client()
+    url = settings.base_url.rstrip("/") + "/"
+    # 응답 코드는 상관없음(404 여도 커넥션은 풀에 남음)
+    await asyncio.gather(*(client.head(url) for _ in range(max(1, settings.WARMUP_CONNECTIONS))))
+
+
+async def _token() -> None:
+    await auth.get_token()
+
+
+async def _endpoints() -> None:
+    dep, bal = await asyncio.gather(kiwoom.fetch_deposit(), kiwoom.fetch_balance())
+    if not (dep["ok"] and bal["ok"]):
+        raise RuntimeError(f"deposit={dep.get('status', 200)} balance={bal.get('status', 200)}")
+
+
+async def _summary() -> None:
+    res = await asyncio.shield(_summary_refresh_shared())
+    if res["data"]["errors"]:
+        raise RuntimeError("; ".join(res["data"]["errors"]))
+
+
+async def _run() -> None:
+    _state["started_at"] = time.time()
+    try:
+        await asyncio.wait_for(_phases(), settings.WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        _state["timed_out"] = True
+    finally:
+        _state["finished_at"] = time.time()
+        _state["ready"] = True
+
+
+async def _phases() -> None:
+    await asyncio.gather(_step("connections", _connections), _step("token", _token))
+    if _state["steps"]["token"]["ok"]:
+        await asyncio.gather(_step("endpoints", _endpoints), _step("summary", _summary))
+
+
+def start() -> None:
+    global _task
+    if not settings.WARMUP_ENABLED:
+        _state["ready"] = True
+        return
+    if _task is None or _task.done():
+        _task = asyncio.ensure_future(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def status() -> Dict[str, Any]:
+    steps = _state["steps"]
+    out = {**_state, "degraded": [k for k, v in steps.items() if not v["ok"]]}
+    if _state["started_at"] and _state["finished_at"]:
+        out["elapsed_ms"] = round((_state["finished_at"] - _state["started_at"]) * 1000, 1)
+    return out
@@ -0,0 +1,214 @@
+# D:\suyatrade_web_rest\scripts\bench.py
+"""
+백엔드 부하/지연 벤치마크 (open-loop, 목표 RPS 고정).
+
+기본(--api 미지정): mock_kiwoom 을 같은 프로세스에서 띄우고
+백엔드 FastAPI 앱을 ASGI 로 직접 호출 → 네트워크/실서버 없이 재현 가능.
+
+  python bench.py --routes summary,buy --rps 50 --duration 10 --out ../bench/run1.json
+  python bench.py --compare ../bench/run1.json ../bench/run2.json
+  python bench.py --api http://127.0.0.1:5174 --routes summary   # 떠 있는 서버 대상
+
+녹화/재생(업스트림을 고정해서 빌드끼리 비교):
+  python bench.py --routes summary,buy --record ../bench/day1.ndjson.gz
+  python bench.py --routes summary,buy --replay ../bench/day1.ndjson.gz --replay-speed 0 \
+                  --profile ../bench/new.pstats --out ../bench/new.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+CUR = Path(__file__).resolve()
+BACKEND = CUR.parents[1] / "backend"
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(CUR.parent))
+
+ROUTES = {
+    "summary": ("GET", "/api/account/summary", None),
+    "summary_fresh": ("GET", "/api/account/summary?refresh=1", None),
+    "buy": ("POST", "/orders/stock/buy", {"code": "005930", "qty": 1, "market": True, "price": 0}),
+    "sell": ("POST", "/orders/stock/sell", {"code": "005930", "qty": 1, "market": True, "price": 0}),
+    "health": ("GET", "/api/health", None),
+}
+
+
+def _pct(sorted_ms: list[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, int(round(p / 100 * (len(sorted_ms) - 1)))))
+    return round(sorted_ms[k], 3)
+
+
+def _summarize(lat: list[float], errors: int, elapsed: float) -> dict:
+    s = sorted(lat)
+    return {
+        "count": len(s),
+        "errors": errors,
+        "p50_ms": _pct(s, 50),
+        "p95_ms": _pct(s, 95),
+        "p99_ms": _pct(s, 99),
+        "mean_ms": round(sum(s) / len(s), 3) if s else 0.0,
+        "max_ms": round(s[-1], 3) if s else 0.0,
+        "throughput_rps": round(len(s) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def _drive(client, name: str, rps: float, duration: float) -> dict:
+    method, path, body = ROUTES[name]
+    lat: list[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        headers = {"X-Idempotency-Key": str(uuid.uuid4())} if method == "POST" else {}
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, path, json=body, headers=headers)
+            if r.status_code >= 400:
+                errors += 1
+        except Exception:
+            errors += 1
+            return
+        lat.append((time.perf_counter() - t0) * 1000)
+
+    # open-loop: 응답을 기다리지 않고 일정 간격으로 발사(지연이 쌓이면 그대로 드러남)
+    tasks = []
+    interval = 1.0 / rps
+    start = time.perf_counter()
+    n = int(rps * duration)
+    for i in range(n):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one()))
+    await asyncio.gather(*tasks)
+    return _summarize(lat, errors, time.perf_counter() - start)
+
+
+async def _run_inproc(args) -> dict:
+    import uvicorn
+    from mock_kiwoom import MockConfig, create_app
+
+    server = mock_task = None
+    if not args.replay:
+        cfg = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_429, seed=args.seed)
+        server = uvicorn.Server(uvicorn.Config(create_app(cfg), host="127.0.0.1", port=args.mock_port,
+                                               log_level="warning", lifespan="off"))
+        mock_task = asyncio.ensure_future(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+    # 백엔드 설정은 import 시점에 읽으므로 환경변수를 먼저 세팅
+    os.environ["MOCK_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    if args.record:
+        os.environ["UPSTREAM_RECORD"] = str(Path(args.record).resolve())
+    if args.replay:
+        os.environ["UPSTREAM_REPLAY"] = str(Path(args.replay).resolve())
+        os.environ["REPLAY_SPEED"] = str(args.replay_speed)
+    os.environ.setdefault("APP_KEY", "bench")
+    os.environ.setdefault("APP_SECRET", "bench")
+    os.environ.setdefault("ACCOUNT_NO", "00000000")
+    os.environ["TOKEN_PERSIST"] = "0"
+    import httpx
+    from app.main import app
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                return await _run_routes(client, args)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await mock_task
+
+
+async def _run_routes(client, args) -> dict:
+    out = {}
+    for name in args.routes.split(","):
+        out[name] = await _drive(client, name.strip(), args.rps, args.duration)
+        print(f"{name:>14}: " + " ".join(f"{k}={v}" for k, v in out[name].items()))
+    return out
+
+
+async def _run_remote(args) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=args.api, timeout=60) as client:
+        return await _run_routes(client, args)
+
+
+def _compare(old_path: str, new_path: str) -> None:
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))["routes"]
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))["routes"]
+    for name in sorted(set(old) & set(new)):
+        parts = []
+        for k in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            a, b = old[name][k], new[name][k]
+            pct = ((b - a) / a * 100) if a else 0.0
+            parts.append(f"{k}={a}->{b} ({pct:+.1f}%)")
+        print(f"{name:>14}: " + " ".join(parts))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="suyatrade backend benchmark")
+    ap.add_argument("--routes", default="summary,buy", help=",".join(ROUTES))
+    ap.add_argument("--rps", type=float, default=20.0)
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--api", default=None, help="지정하면 떠 있는 백엔드로 HTTP 호출")
+    ap.add_argument("--mock-port", type=int, default=5180)
+    ap.add_argument("--latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None)
+    ap.add_argument("--record", default=None, help="업스트림 요청/응답 녹화 파일(.gz 가능)")
+    ap.add_argument("--replay", default=None, help="모의서버 대신 이 녹화본으로 응답")
+    ap.add_argument("--replay-speed", type=float, default=1.0, help="1=녹화 지연 그대로, 0=대기 없이")
+    ap.add_argument("--profile", default=None, help="cProfile 결과(.pstats) 저장 경로")
+    args = ap.parse_args()
+
+    if args.compare:
+        _compare(*args.compare)
+        return
+
+    run = _run_remote(args) if args.api else _run_inproc(args)
+    if args.profile:
+        import cProfile
+
+        prof = cProfile.Profile()
+        routes = prof.runcall(asyncio.run, run)
+        Path(args.profile).parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(args.profile)
+        print("profile:", args.profile, "(python -m pstats 로 열기)")
+    else:
+        routes = asyncio.run(run)
+    result = {
+        "meta": {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.api or ("inproc+replay" if args.replay else "inproc+mock"),
+            "replay": {"path": args.replay, "speed": args.replay_speed} if args.replay else None,
+            "rps": args.rps,
+            "duration": args.duration,
+            "mock": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+                     "error_rate": args.error_rate, "rate_429": args.rate_429},
+        },
+        "routes": routes,
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print("saved:", args.out)
+
+
+if __name__ == "__main__":
+    main()
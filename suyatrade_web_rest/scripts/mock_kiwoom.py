@@ -0,0 +1,201 @@
+# D:\suyatrade_web_rest\scripts\mock_kiwoom.py
+"""
+mockapi.kiwoom.com 로컬 대역 (오프라인 테스트/벤치마크용).
+
+  python mock_kiwoom.py --port 5180 --latency-ms 40 --jitter-ms 20 --rate-429 0.02
+  → backend/.env 에 MOCK_BASE_URL=http://127.0.0.1:5180
+
+구현 경로:
+  - POST /oauth2/token
+  - POST /api/dostk/ordr                         (kt10000/kt10001)
+  - POST /api/dostk/stkinfo                      (ka10095 관심종목 시세, "|" 구분 여러 종목)
+  - POST 예수금/잔고 후보 (/api/{dsacc,accno,acc}/{deposit,balance}) — 하나만 200
+  - GET  /uapi/domestic-stock/v1/trading/inquire-balance   (--holdings N 이면 연속조회 페이지)
+  - GET  /uapi/domestic-stock/v1/trading/inquire-psbl-deposit
+  - POST /bot{token}/sendMessage                 (텔레그램 대역, GET /_mock/telegram 으로 확인)
+  - POST /_mock/fail?count=1&status=500&prefix=/uapi   (다음 N건 강제 실패, 재현용)
+      delay_ms=3000 이면 그만큼 늦게 응답, status=0 이면 정상 처리 후 응답만 늦춤(응답 못 받은 주문 재현)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 30.0       # 평균 지연
+    jitter_ms: float = 10.0        # ± 균등 분포
+    error_rate: float = 0.0        # 500 응답 비율
+    rate_429: float = 0.0          # 429 응답 비율
+    retry_after: float = 0.5       # 429 의 Retry-After(초)
+    deposit_path: str = "/api/acc/deposit"
+    balance_path: str = "/api/acc/balance"
+    holdings: int = 0              # inquire-balance 보유 종목 수
+    page_size: int = 20            # 연속조회 페이지 크기
+    seed: int | None = None
+
+
+def create_app(cfg: MockConfig | None = None) -> FastAPI:
+    cfg = cfg or MockConfig()
+    rnd = random.Random(cfg.seed)
+    ord_seq = itertools.count(1)
+    app = FastAPI(title="Kiwoom mock")
+    app.state.cfg = cfg
+    app.state.hits = {}
+    app.state.fail_next = {"count": 0, "status": 500, "prefix": "", "delay_ms": 0}
+
+    @app.middleware("http")
+    async def _faults(request: Request, call_next):
+        path = request.url.path
+        app.state.hits[path] = app.state.hits.get(path, 0) + 1
+        delay = max(0.0, cfg.latency_ms + rnd.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        fail = app.state.fail_next
+        if fail["count"] > 0 and not path.startswith("/_mock") and path.startswith(fail["prefix"]):
+            fail["count"] -= 1
+            if not fail["status"]:
+                # 처리는 하고 응답만 늦춤(접수됐는데 응답을 못 받은 주문)
+                resp = await call_next(request)
+                await asyncio.sleep(fail.get("delay_ms", 0) / 1000)
+                return resp
+            await asyncio.sleep(fail.get("delay_ms", 0) / 1000)
+            return JSONResponse({"return_code": 99, "rt_cd": "1", "msg1": "주입된 오류(mock)"},
+                                status_code=fail["status"])
+        roll = rnd.random()
+        if roll < cfg.rate_429:
+            return JSONResponse({"return_code": 5, "return_msg": "요청 과다(mock)"},
+                                status_code=429, headers={"Retry-After": str(cfg.retry_after)})
+        if roll < cfg.rate_429 + cfg.error_rate:
+            return JSONResponse({"return_code": 99, "return_msg": "서버 오류(mock)"}, status_code=500)
+        return await call_next(request)
+
+    @app.post("/oauth2/token")
+    async def token():
+        return {
+            "return_code": 0,
+            "return_msg": "정상적으로 처리되었습니다",
+            "token_type": "bearer",
+            "token": f"MOCK{int(time.time() * 1000):x}{rnd.getrandbits(64):016x}",
+            "expires_dt": time.strftime("%Y%m%d%H%M%S", time.localtime(time.time() + 86400)),
+        }
+
+    @app.post("/api/dostk/ordr")
+    async def order(request: Request):
+        body = await request.json()
+        api_id = request.headers.get("api-id", "")
+        if api_id not in ("kt10000", "kt10001"):
+            return JSONResponse({"return_code": 2, "return_msg": f"unknown api-id {api_id}"}, status_code=400)
+        return {
+            "return_code": 0,
+            "return_msg": "모의 주문 접수",
+            "ord_no": f"{next(ord_seq):07d}",
+            "pdno": body.get("pdno"),
+            "ord_qty": body.get("ord_qty"),
+        }
+
+    @app.post("/api/dostk/stkinfo")
+    async def stkinfo(request: Request):
+        # ka10095: stk_cd = "005930|000660|..." → 종목별 결정적 가격
+        body = await request.json()
+        rows = []
+        for code in str(body.get("stk_cd", "")).split("|"):
+            if not code:
+                continue
+            base = 1000 + (int(code) if code.isdigit() else sum(map(ord, code))) % 100000
+            rows.append({"stk_cd": code, "stk_nm": f"MOCK{code}", "cur_prc": f"+{base}",
+                         "pred_pre": "+10", "flu_rt": "+0.10", "trde_qty": "1000"})
+        return {"return_code": 0, "return_msg": "정상", "atn_stk_infr": rows}
+
+    @app.post("/api/{grp}/{kind}")
+    async def acct(grp: str, kind: str):
+        path = f"/api/{grp}/{kind}"
+        if path == cfg.deposit_path:
+            return {"예수금": "10,000,000", "주문가능금액": "9,500,000"}
+        if path == cfg.balance_path:
+            return {"총매입금액": "1,200,000", "총평가금액": "1,260,000",
+                    "총평가손익금액": "60,000", "총수익률(%)": "5.00", "당일실현손익": "0"}
+        return JSONResponse({"return_code": 404, "return_msg": "no such api"}, status_code=404)
+
+    @app.get("/uapi/domestic-stock/v1/trading/inquire-balance")
+    async def inquire_balance(CTX_AREA_NK100: str = ""):
+        # 첫 페이지 맨 앞은 합계 행, 이후 종목 행(pdno). NK100 = 다음 시작 위치
+        start = int(CTX_AREA_NK100 or 0)
+        end = min(cfg.holdings, start + cfg.page_size)
+        rows = [{
+            "pdno": f"{900000 + i:06d}", "prdt_name": f"MOCK{i}", "hldg_qty": str(i + 1),
+            "pchs_avg_pric": "10000.0", "prpr": "10500", "evlu_amt": str((i + 1) * 10500),
+            "evlu_pfls_amt": str((i + 1) * 500),
+        } for i in range(start, end)]
+        if not start:
+            rows.insert(0, {
+                "pchs_amt_smtby": "1200000", "tot_evlu_amt": "1260000",
+                "evlu_pfls_smtby": "60000", "evlu_erng_rt": "5.00",
+                "dnca_tot_amt": "10000000", "ord_psbl_cash": "9500000", "thdt_pnl_amt": "0",
+            })
+        more = end < cfg.holdings
+        return JSONResponse(
+            {"rt_cd": "0", "output1": rows,
+             "ctx_area_fk100": "MOCK" if more else "", "ctx_area_nk100": str(end) if more else ""},
+            headers={"tr_cont": "M" if more else "D"},
+        )
+
+    @app.get("/uapi/domestic-stock/v1/trading/inquire-psbl-deposit")
+    async def inquire_psbl_deposit():
+        return {"rt_cd": "0", "output": [{"dnca_tot_amt": "10000000", "ord_psbl_cash": "9500000"}]}
+
+    # 텔레그램 대역: TELEGRAM_API_BASE=http://127.0.0.1:5180
+    app.state.telegram = []
+
+    @app.post("/bot{token}/sendMessage")
+    async def tg_send(token: str, request: Request):
+        body = await request.json()
+        app.state.telegram.append({"token": token, **body})
+        return {"ok": True, "result": {"message_id": len(app.state.telegram)}}
+
+    @app.get("/_mock/telegram")
+    async def tg_messages():
+        return app.state.telegram
+
+    @app.post("/_mock/fail")
+    async def fail_next(count: int = 1, status: int = 500, prefix: str = "", delay_ms: float = 0):
+        """다음 count 건(경로가 prefix 로 시작하는 것만)을 delay_ms 뒤 status 로 실패시킴(0 이면 정상 처리)."""
+        app.state.fail_next = {"count": count, "status": status, "prefix": prefix, "delay_ms": delay_ms}
+        return app.state.fail_next
+
+    @app.get("/_mock/hits")
+    async def hits():
+        return app.state.hits
+
+    return app
+
+
+def _parse() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Kiwoom mock server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5180)
+    ap.add_argument("--latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=float, default=0.5)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--holdings", type=int, default=0)
+    ap.add_argument("--page-size", type=int, default=20)
+    return ap.parse_args()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    a = _parse()
+    cfg = MockConfig(a.latency_ms, a.jitter_ms, a.error_rate, a.rate_429, a.retry_after,
+                     holdings=a.holdings, page_size=a.page_size, seed=a.seed)
+    uvicorn.run(create_app(cfg), host=a.host, port=a.port, log_level="warning")
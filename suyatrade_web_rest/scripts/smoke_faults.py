@@ -0,0 +1,241 @@
+# D:\suyatrade_web_rest\scripts\smoke_faults.py
+"""
+장애 회귀 스모크 (mock_kiwoom 을 같은 프로세스에서 띄우고 /_mock/fail 로 오류 주입).
+
+  python smoke_faults.py            # 전부
+  python smoke_faults.py summary    # 이름으로 골라서
+
+실패가 하나라도 있으면 종료 코드 1.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+CUR = Path(__file__).resolve()
+BACKEND = CUR.parents[1] / "backend"
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(CUR.parent))
+
+MOCK_PORT = 5181
+UAPI = "/uapi/domestic-stock/v1/trading"
+
+
+async def check_decode_plan(client, mock) -> None:
+    """첫 본문이 {} 여도 별칭 계획이 "전부 없음"으로 굳지 않아야 함."""
+    from app import decode
+
+    decode.KIS_BALANCE.decode({}, "smoke")
+    rec = decode.KIS_BALANCE.decode({"tot_evlu_amt": "1260000", "pchs_amt_smtby": "1",
+                                     "evlu_pfls_smtby": "1", "evlu_erng_rt": "1",
+                                     "thdt_pnl_amt": "0"}, "smoke")
+    assert rec.total_eval == 1260000, rec.as_dict()
+    # today_realized 는 처음 0 이 아닌 값
+    rec = decode.KIS_BALANCE.decode({"prdy_cprs_pl": "0", "thdt_pnl_amt": "5000"}, "smoke")
+    assert rec.today_realized == 5000, rec.as_dict()
+
+
+async def check_market_cash(client, mock) -> None:
+    """시장가 매수 뒤 대사: 브로커 주문가능금액이 줄어도 현금 drift 로 보지 않음(지정가는 그대로 비교)."""
+    from app.routes_positions import PositionBook
+
+    b = PositionBook()
+    b.reconcile([], {"deposit": 1_000_000, "orderable": 1_000_000})
+    b.on_order("005930", True, 10, True, 70_000, 200, {"return_code": 0})
+    assert b.cash["orderable"] == 300_000, b.cash
+    assert not b.reconcile([], {"deposit": 1_000_000, "orderable": 295_000})
+    b.on_order("005930", True, 1, False, 70_000, 200, {"return_code": 0})
+    drift = b.reconcile([], {"deposit": 1_000_000, "orderable": 200_000})
+    assert drift == [{"cash": "orderable", "book": 225_000, "broker": 200_000}], drift
+
+
+async def check_debug(client, mock) -> None:
+    """raw/trace 는 debug=1 일 때만."""
+    plain = (await client.get("/api/account/deposit")).json()
+    dbg = (await client.get("/api/account/deposit", params={"debug": 1})).json()
+    assert plain["ok"] and "raw" not in plain and "trace" not in plain, plain
+    assert "raw" in dbg and "trace" in dbg, dbg
+
+
+async def check_summary(client, mock) -> None:
+    """업스트림 500 한 번 뒤에도 요약이 0 으로 굳지 않고, 실패 결과는 errors 에 남아야 함."""
+    mock.state.fail_next = {"count": 2, "status": 500, "prefix": UAPI}
+    bad = (await client.get("/api/account/summary", params={"refresh": 1})).json()
+    assert bad["errors"], bad
+    good = (await client.get("/api/account/summary")).json()
+    assert not good["errors"] and good["deposit"] and good["total_eval"], good
+
+
+async def check_reconcile(client, mock) -> None:
+    """대사 중 업스트림 500 이면 502 + 기존 장부 유지(현금 0/포지션 삭제 금지)."""
+    r = await client.post("/api/positions/reconcile")
+    assert r.status_code == 200, r.text
+    before = (await client.get("/api/positions")).json()
+    assert before["cash"]["deposit"] and len(before["positions"]) == 45, before["cash"]
+
+    mock.state.fail_next = {"count": 3, "status": 500, "prefix": UAPI}
+    r = await client.post("/api/positions/reconcile")
+    assert r.status_code == 502, r.text
+    after = (await client.get("/api/positions")).json()
+    assert after["cash"] == before["cash"] and after["positions"] == before["positions"], after["cash"]
+    assert not after["drift"], after["drift"]
+    assert after["reconcile_error"], "reconcile_error 가 스냅샷에 없음"
+
+
+async def check_order_timeout(client, mock) -> None:
+    """주문은 적응형 타임아웃으로 자르지 않고, 응답 못 받은 주문은 같은 키로 재전송하지 않아야 함."""
+    order = {"code": "005930", "qty": 1, "market": True}
+    for _ in range(25):   # kt10000 지연 표본(p99×3 → 하한 1초)
+        r = await client.post("/orders/stock/buy", json=order)
+        assert r.status_code == 200, r.text
+
+    # 1.5초: 적응형이면 1초에서 잘렸을 응답
+    mock.state.fail_next = {"count": 1, "status": 0, "prefix": "/api/dostk/ordr", "delay_ms": 1500}
+    r = await client.post("/orders/stock/buy", json=order)
+    assert r.status_code == 200 and r.json()["status_code"] == 200, r.text
+
+    # HTTP_TIMEOUT 초과: 504 + 같은 키 재요청은 업스트림으로 가지 않음
+    sent = mock.state.hits.get("/api/dostk/ordr", 0)
+    mock.state.fail_next = {"count": 1, "status": 0, "prefix": "/api/dostk/ordr", "delay_ms": 4000}
+    hdr = {"x-idempotency-key": "smoke-timeout-1"}
+    r = await client.post("/orders/stock/buy", json=order, headers=hdr)
+    assert r.status_code == 504 and r.json()["detail"]["error"] == "ORDER_OUTCOME_UNKNOWN", r.text
+    r = await client.post("/orders/stock/buy", json=order, headers=hdr)
+    assert r.status_code == 504, r.text
+    assert mock.state.hits.get("/api/dostk/ordr", 0) == sent + 1, mock.state.hits
+
+
+async def check_batch_disconnect(client, mock) -> None:
+    """일괄 주문 스트림이 끊겨도 이미 전송한 주문은 저널/장부에 남고, 전송 전 주문은 보내지 않아야 함."""
+    import time
+    from app.journal import journal
+    from app.routes_orders import BatchOrderReq, order_batch
+
+    qtys = list(range(101, 107))
+    req = BatchOrderReq(orders=[{"code": "005930", "qty": q, "market": True, "side": "buy"} for q in qtys],
+                        concurrency=2)
+    t0 = time.time()
+    sent = mock.state.hits.get("/api/dostk/ordr", 0)
+    mock.state.fail_next = {"count": 6, "status": 0, "prefix": "/api/dostk/ordr", "delay_ms": 500}
+    resp = await order_batch(req, stream=True)
+    it = resp.body_iterator
+    await it.__anext__()          # 한 줄 받고
+    await asyncio.sleep(0.2)      # 다음 주문들이 전송 중일 때 끊음
+    await it.aclose()
+    await asyncio.sleep(1.5)      # 전송 중이던 주문 완료 + 저널 flush
+
+    sent = mock.state.hits.get("/api/dostk/ordr", 0) - sent
+    day = time.strftime("%Y%m%d")
+    recs = [r for r in journal.query(day, "005930", 0, 1000)["items"] if r["ts"] >= t0 and r.get("qty") in qtys]
+    assert 0 < sent < len(qtys), sent
+    assert len(recs) == sent and all(r.get("status") == 200 for r in recs), (sent, recs)
+
+
+async def check_algo_unknown(client, mock) -> None:
+    """결과를 모르는 자식 주문은 새 키로 다시 보내지 않고 모주문을 멈춰야 함."""
+    sent = mock.state.hits.get("/api/dostk/ordr", 0)
+    mock.state.fail_next = {"count": 1, "status": 0, "prefix": "/api/dostk/ordr", "delay_ms": 4000}
+    r = await client.post("/api/algo/orders", json={"code": "005930", "qty": 3, "market": True, "side": "buy",
+                                                     "policy": "iceberg", "display_qty": 1, "interval": 1})
+    assert r.status_code == 200, r.text
+    pid = r.json()["id"]
+    await asyncio.sleep(6.0)
+    p = (await client.get(f"/api/algo/orders/{pid}")).json()
+    assert p["status"] == "failed" and p["unknown_qty"] == 1 and p["remaining"] == 2, p
+    assert mock.state.hits.get("/api/dostk/ordr", 0) == sent + 1, mock.state.hits
+
+
+async def check_stream(client, mock) -> None:
+    """끊긴 WebSocket 은 바로 구독 해제, 오류 섞인 요약은 스냅샷으로 뿌리지 않음."""
+    import json
+
+    import uvicorn
+    import websockets
+    from app.main import app
+    from app.routes_stream import hub
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=MOCK_PORT + 1,
+                                           log_level="warning", lifespan="off",
+                                           timeout_graceful_shutdown=2))
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    url = f"ws://127.0.0.1:{MOCK_PORT + 1}/api/stream/account"
+    try:
+        mock.state.fail_next = {"count": 2, "status": 500, "prefix": UAPI, "delay_ms": 0}
+        async with websockets.connect(url) as ws:
+            first = json.loads(await asyncio.wait_for(ws.recv(), 10))
+            second = json.loads(await asyncio.wait_for(ws.recv(), 10))
+        assert first["type"] == "error", first
+        assert second["type"] == "snapshot" and second["data"]["total_eval"], second
+        for _ in range(3):
+            async with websockets.connect(url):
+                pass
+        await asyncio.sleep(0.5)
+        assert hub.stats() == {"subscribers": 0, "polling": False}, hub.stats()
+    finally:
+        server.should_exit = True
+        await task
+
+
+CHECKS = {
+    "decode": check_decode_plan,
+    "summary": check_summary,
+    "debug": check_debug,
+    "market_cash": check_market_cash,
+    "reconcile": check_reconcile,
+    "order_timeout": check_order_timeout,
+    "batch_disconnect": check_batch_disconnect,
+    "algo_unknown": check_algo_unknown,
+    "stream": check_stream,
+}
+
+
+async def main(names: list[str]) -> int:
+    import uvicorn
+    from mock_kiwoom import MockConfig, create_app
+
+    mock = create_app(MockConfig(latency_ms=2, jitter_ms=0, holdings=45, page_size=20, seed=1))
+    server = uvicorn.Server(uvicorn.Config(mock, host="127.0.0.1", port=MOCK_PORT,
+                                           log_level="warning", lifespan="off"))
+    mock_task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    # 백엔드 설정은 import 시점에 읽으므로 환경변수를 먼저 세팅
+    os.environ["MOCK_BASE_URL"] = f"http://127.0.0.1:{MOCK_PORT}"
+    os.environ.setdefault("APP_KEY", "smoke")
+    os.environ.setdefault("APP_SECRET", "smoke")
+    os.environ.setdefault("ACCOUNT_NO", "00000000")
+    os.environ["TOKEN_PERSIST"] = "0"
+    os.environ["WARMUP_ENABLED"] = "0"
+    os.environ["POSITION_RECONCILE_SECONDS"] = "0"
+    os.environ["BREAKER_FAILURES"] = "1000"   # 주입한 오류로 서킷이 열리지 않도록
+    os.environ["HTTP_TIMEOUT"] = "3"
+    import httpx
+    from app.main import app
+
+    failed = 0
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://smoke", timeout=30) as client:
+                for name in names:
+                    try:
+                        await CHECKS[name](client, mock)
+                        print(f"PASS {name}")
+                    except Exception as e:
+                        failed += 1
+                        print(f"FAIL {name}: {type(e).__name__}: {e}")
+                    finally:
+                        mock.state.fail_next = {"count": 0, "status": 500, "prefix": "", "delay_ms": 0}
+    finally:
+        server.should_exit = True
+        await mock_task
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:] or list(CHECKS))))
@@ -67,6 +67,37 @@ async function issueToken() {
 // ===== 계좌 요약 =====
 let _busyBalance = false;
 
+// 받은 필드만 갱신(스트림 delta 는 바뀐 필드만 옴)
+const SUMMARY_LABELS = {
+  deposit: ["labDeposit", fmtMoney],
+  orderable: ["labAvail", fmtMoney],
+  today_realized: ["labToday", fmtMoney],
+  total_purchase: ["labPurchase", fmtMoney],
+  total_eval: ["labEval", fmtMoney],
+  total_pl: ["labPL", fmtMoney],
+  total_return: ["labReturn", fmtPercent],
+};
+
+function renderSummary(j) {
+  for (const [k, [id, fmt]] of Object.entries(SUMMARY_LABELS)) {
+    if (k in j && $(id)) $(id).textContent = fmt(j[k]);
+  }
+}
+
+// 서버 푸시 구독(SSE). 서버 폴러 1개를 모든 탭이 공유 → 탭마다 폴링 안 함
+function subscribeAccount() {
+  if (!window.EventSource) return;
+  const es = new EventSource("/api/stream/account");
+  es.onmessage = (ev) => {
+    try {
+      const msg = JSON.parse(ev.data);
+      if (msg.type === "snapshot" || msg.type === "delta") renderSummary(msg.data || {});
+    } catch (e) {
+      console.warn("account stream parse error:", e);
+    }
+  };
+}
+
 async function refreshAccountSummary() {
   if (_busyBalance) return;
   _busyBalance = true;
@@ -78,13 +109,7 @@ async function refreshAccountSummary() {
   }
   try {
     const j = await jsonFetch("/api/account/summary");
-    $("labDeposit").textContent  = fmtMoney(j.deposit);
-    $("labAvail").textContent    = fmtMoney(j.orderable);
-    $("labToday").textContent    = fmtMoney(j.today_realized);
-    $("labPurchase").textContent = fmtMoney(j.total_purchase);
-    $("labEval").textContent     = fmtMoney(j.total_eval);
-    $("labPL").textContent       = fmtMoney(j.total_pl);
-    $("labReturn").textContent   = fmtPercent(j.total_return);
+    renderSummary(j);
 
     if (j.ok === false) {
       toast("일부 항목 수집 실패(로그 확인)", false);
@@ -206,6 +231,32 @@ async function saveTelegram() {
 }
 
 // ===== 수동 주문 =====
+// 수동 주문 종목 현재가 (/api/quotes: 서버 캐시 공유)
+async function showQuote(side) {
+  const code = $(side === "buy" ? "manBuyCode" : "manSellCode").value.trim();
+  const el = $(side === "buy" ? "manBuyQuote" : "manSellQuote");
+  if (!el) return;
+  if (!code) {
+    el.textContent = "-";
+    return;
+  }
+  try {
+    const j = await jsonFetch(`/api/quotes?codes=${encodeURIComponent(code)}`);
+    const q = j.quotes[code];
+    if (!q) {
+      el.textContent = `${code}: 시세 없음 (${j.errors[code] || "-"})`;
+      return;
+    }
+    el.textContent = `${q.name} 현재가 ${fmtMoney(q.price)} (${q.change >= 0 ? "+" : ""}${fmtPercent(q.rate)})`;
+    // 지정가인데 가격이 비어 있으면 현재가로 채움
+    const priceEl = $(side === "buy" ? "manBuyPrice" : "manSellPrice");
+    const mkt = $(side === "buy" ? "manBuyMarket" : "manSellMarket").value === "true";
+    if (!mkt && !Number(priceEl.value)) priceEl.value = q.price;
+  } catch (e) {
+    el.textContent = "시세 조회 실패";
+  }
+}
+
 async function manualOrder(side) {
   const code = $(side === "buy" ? "manBuyCode" : "manSellCode").value.trim();
   const qty  = Number($(side === "buy" ? "manBuyQty" : "manSellQty").value || 0);
@@ -247,11 +298,16 @@ window.addEventListener("DOMContentLoaded", () => {
   // 수동 주문
   $("manBuyBtn")?.addEventListener("click", () => manualOrder("buy"));
   $("manSellBtn")?.addEventListener("click", () => manualOrder("sell"));
+  $("manBuyCode")?.addEventListener("change", () => showQuote("buy"));
+  $("manSellCode")?.addEventListener("change", () => showQuote("sell"));
+  $("manBuyMarket")?.addEventListener("change", () => showQuote("buy"));
+  $("manSellMarket")?.addEventListener("change", () => showQuote("sell"));
 
   // 최초 상태 로드
   ping();
   loadGeneral();
   loadTelegram();
+  subscribeAccount();
 });
 
 // (선택) 디버그를 위해 전역에 노출